@@ -1,91 +1,674 @@
 # extract_tables_by_table1_reset.py
+#
+#   python extract_docx_tables.py                                  # the default research document
+#   python extract_docx_tables.py "Research Data And Findings" *.docx -o output_tables -j 4
+#   python extract_docx_tables.py ../Aesthetic_Market_Analysis_Tables.zip             # .docx and .csv members
+#
+# Inputs can be files, directories (searched recursively) or glob patterns. Zip archives are read in memory,
+# nested ones included: each .docx member is a document and each .csv member a one-table document, named
+# "bundle.zip!folder/member.docx". Each document's tables go to <output>/<document name>/, and documents are
+# extracted in parallel by a process pool.
+# --streaming parses word/document.xml incrementally for very large documents.
+# Tables are decoded from the grid itself: a merged cell's text appears once, in its top-left slot, and
+# multi-row headers become "Group / Column" names; merged body cells are recorded under "spans" in the manifest.
+# <output>/manifest.json records a hash of every document and table: unchanged documents are skipped, only
+# changed tables are rewritten, and <output>/changes.json lists what was added, changed or removed.
+# --store tables.parquet (or .sqlite) also collects every table into one long dataset with provenance columns
+# and writes the combined market table, <output>/Combined_Aesthetic_Market.csv. With --types, money, percentages,
+# numeric ranges and years are parsed into kind/low/high/unit columns and <output>/column_types.csv reports how
+# confidently each column was typed.
 
 import os
 import re
+import sys
+import glob
+import time
+import json
+import io
+import csv
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+import zipfile
+import argparse
+import xml.etree.ElementTree as ET
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from docx import Document
 
 # === Setup ===
 input_docx = "Comprehensive Aesthetic Services Market Analysis Tables.docx"
 output_folder = "output_tables"
-os.makedirs(output_folder, exist_ok=True)
-
-doc = Document(input_docx)
+MANIFEST_NAME = "manifest.json"
+CHANGES_NAME = "changes.json"
+DECODER_VERSION = 2  # bump when table output changes, so existing manifests re-extract everything
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+TEXT_TAGS = {W + "t", W + "delText", W + "instrText"}
+MEMBER_SEP = "!"  # between an archive and a member: bundle.zip!tables/report.docx, nested as outer.zip!inner.zip!a.docx
+MEMBER_TYPES = (".docx", ".csv")
+COMBINED_NAME = "Combined_Aesthetic_Market.csv"
+STORE_FORMATS = {".parquet": "parquet", ".sqlite": "sqlite", ".db": "sqlite"}
+STORE_COLUMNS = ["document", "source", "section", "table_number", "title", "file", "row_index", "column_index", "row_span",
+                 "col_span", "column", "value"]
+TABLE_FILE_RE = re.compile(r"(A\d+)_Table_(\d+)_(.*)\.csv$")
+TYPES_NAME = "column_types.csv"
+TYPE_MIN_CONFIDENCE = 0.8  # share of a column's non-empty cells that must parse as its kind
+CURRENCIES = {"$": "USD", "us$": "USD", "usd": "USD", "€": "EUR", "eur": "EUR", "£": "GBP", "gbp": "GBP",
+              "aed": "AED", "sar": "SAR", "egp": "EGP"}
+MAGNITUDES = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6, "b": 1e9, "bn": 1e9, "billion": 1e9,
+              "trillion": 1e12}
 
 def sanitize_filename(text):
     return re.sub(r'[^a-zA-Z0-9_]', '_', text.strip()).strip('_')[:60]
 
-# === State ===
-section_id_counter = 0
-table_in_section = 0
-current_section_id = None
-last_detected_title = None
-
-# Map paragraph elements
-elements = list(doc.element.body)
-paragraphs = doc.paragraphs
-para_map = {}
-p_idx = 0
-for el in elements:
-    if el.tag.endswith('}p') and p_idx < len(paragraphs):
-        para_map[el] = paragraphs[p_idx]
-        p_idx += 1
-
-table_objects = doc.tables
-table_obj_index = 0
-
-# === Parse Document ===
-for el in elements:
-    tag = el.tag.split('}')[-1]
-
-    if tag == 'p':
-        para = para_map.get(el)
-        text = para.text.strip()
-
-        # Detect "Table X: Title"
-        match = re.match(r"Table\s*(\d+)\s*:\s*(.+)", text, re.IGNORECASE)
-        if match:
-            table_number = int(match.group(1))
-            title = sanitize_filename(match.group(2))
-
-            if table_number == 1:
+# === Sources ===
+def split_source(source):
+    # "a.zip!b.zip!c.docx" -> ["a.zip", "b.zip", "c.docx"]; a "!" only separates after a .zip
+    return re.split(r"(?i)(?<=\.zip)" + re.escape(MEMBER_SEP), source)
+
+def source_name(source):
+    # File name of the document itself: "bundle.zip!tables/report.docx" -> "report.docx"
+    return split_source(source)[-1].replace("\\", "/").rsplit("/", 1)[-1]
+
+def open_source(source):
+    # A path on disk as is, or an archive member read into memory (through any nested archives), never to disk
+    path, *members = split_source(source)
+    f = path
+    for member in members:
+        with zipfile.ZipFile(f) as archive:
+            f = io.BytesIO(archive.read(member))
+    return f
+
+def archive_members(archive, prefix):
+    # Sources for the .docx/.csv members of a zip (path or file object), recursing into nested .zip members
+    with zipfile.ZipFile(archive) as bundle:
+        for info in bundle.infolist():
+            name = info.filename
+            base = name.rsplit("/", 1)[-1]
+            if info.is_dir() or name.startswith("__MACOSX/") or base.startswith(("~$", "._")):
+                continue
+            if name.lower().endswith(".zip"):
+                yield from archive_members(io.BytesIO(bundle.read(name)), prefix + MEMBER_SEP + name)
+            elif name.lower().endswith(MEMBER_TYPES):
+                yield prefix + MEMBER_SEP + name
+
+def file_digest(source):
+    f = open_source(source)
+    if not isinstance(f, str):
+        return hashlib.sha256(f.getvalue()).hexdigest()
+    sha = hashlib.sha256()
+    with open(f, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def element_digest(el):
+    # Hash of a table's XML by namespace URI, so python-docx (lxml) and iterparse elements hash alike. Only text
+    # elements contribute text: elsewhere it is indentation, and python-docx overrides .text on w:p and w:r.
+    sha = hashlib.sha1()
+    for node in el.iter():
+        text = (node.text or "") if node.tag in TEXT_TAGS else ""
+        sha.update(str(node.tag).encode("utf-8"))
+        sha.update(repr(sorted(node.attrib.items())).encode("utf-8"))
+        sha.update(text.encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+# === Table Decoding ===
+RUN_TEXT = {W + "t": None, W + "tab": "\t", W + "ptab": "\t", W + "cr": "\n", W + "noBreakHyphen": "-", W + "br": "\n"}
+
+def paragraph_text(p):
+    # Same text as python-docx's Paragraph.text: runs directly in the paragraph or in a hyperlink
+    parts = []
+    for child in p:
+        runs = [child] if child.tag == W + "r" else list(child) if child.tag == W + "hyperlink" else []
+        for run in runs:
+            if run.tag != W + "r":
+                continue
+            for item in run:
+                if item.tag == W + "t":
+                    parts.append(item.text or "")
+                elif item.tag in RUN_TEXT and (item.tag != W + "br" or item.get(W + "type", "textWrapping") == "textWrapping"):
+                    parts.append(RUN_TEXT[item.tag])
+    return "".join(parts)
+
+def grid_value(el, path, default, missing=None):
+    # w:val of a property element, e.g. grid_value(tc, "w:tcPr/w:gridSpan", 1); `missing` when it is absent
+    prop = el.find(path.replace("w:", W))
+    return missing if prop is None else prop.get(W + "val", default)
+
+def decode_table(tbl):
+    # Logical cells of a w:tbl read straight from the grid: each merged cell once, as
+    # {"row", "col", "row_span", "col_span", "text"}, plus the grid size and the w:tblHeader row count.
+    # python-docx's row.cells rebuilds the grid per row and repeats merged cells in every slot they cover.
+    cells, open_merges = [], {}
+    n_rows = n_cols = repeated_header = 0
+    for tr in tbl.iterfind(W + "tr"):
+        col = int(grid_value(tr, "w:trPr/w:gridBefore", 0, 0))
+        if repeated_header == n_rows and grid_value(tr, "w:trPr/w:tblHeader", "1") not in (None, "0", "false"):
+            repeated_header += 1
+        for tc in tr.iterfind(W + "tc"):
+            span = int(grid_value(tc, "w:tcPr/w:gridSpan", 1, 1))
+            merge = grid_value(tc, "w:tcPr/w:vMerge", "continue")
+            # A bare <w:vMerge/> continues the cell above; "restart" (or no merge) starts a new cell
+            if merge == "continue" and col in open_merges:
+                open_merges[col]["row_span"] += 1
+            else:
+                text = "\n".join(paragraph_text(p) for p in tc.iterfind(W + "p")).strip()
+                cell = {"row": n_rows, "col": col, "row_span": 1, "col_span": span, "text": text}
+                cells.append(cell)
+                if merge is not None:
+                    open_merges[col] = cell
+                else:
+                    open_merges.pop(col, None)
+            col += span
+        n_rows += 1
+        n_cols = max(n_cols, col)
+    return {"cells": cells, "rows": n_rows, "cols": n_cols, "header_rows": repeated_header}
+
+def header_row_count(table):
+    # Rows marked as repeating headers; otherwise the first row, grown while a header cell spans down into the
+    # next row or the last header row groups columns under a horizontally merged cell
+    if table["header_rows"]:
+        return table["header_rows"]
+    count = min(1, table["rows"])
+    while count < table["rows"]:
+        header = [c for c in table["cells"] if c["row"] < count]
+        if not any(c["row"] + c["row_span"] > count for c in header) and \
+                not any(c["col_span"] > 1 for c in header if c["row"] == count - 1):
+            break
+        count += 1
+    return count
+
+def table_frame(table):
+    # (DataFrame, spans): merged cells keep their text in the top-left slot only; multi-row headers are joined
+    # as "Group / Column". spans lists [row, column, row_span, col_span] for merged body cells, in frame positions.
+    count = header_row_count(table)
+    names = [[] for _ in range(table["cols"])]
+    rows = [[""] * table["cols"] for _ in range(table["rows"] - count)]
+    spans = []
+    for cell in table["cells"]:
+        if cell["row"] < count:
+            for col in range(cell["col"], min(cell["col"] + cell["col_span"], table["cols"])):
+                if cell["text"] and cell["text"] not in names[col]:
+                    names[col].append(cell["text"])
+            continue
+        rows[cell["row"] - count][cell["col"]] = cell["text"]
+        if cell["row_span"] > 1 or cell["col_span"] > 1:
+            spans.append([cell["row"] - count, cell["col"], cell["row_span"], cell["col_span"]])
+    columns = [" / ".join(parts) for parts in names] if count else list(range(table["cols"]))
+    return pd.DataFrame(rows, columns=columns), spans
+
+def iter_body_docx(input_docx):
+    # ("p", text, None) and ("tbl", decoded table, XML digest) for each top-level body element, via python-docx
+    doc = Document(input_docx)
+    for el in doc.element.body:
+        if el.tag == W + "p":
+            yield 'p', paragraph_text(el), None
+        elif el.tag == W + "tbl":
+            yield 'tbl', decode_table(el), element_digest(el)
+
+def iter_body_csv(source, name):
+    # A CSV member as a one-table document: a "Table 1: <file name>" caption, then the rows with the first as header
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = source.getvalue()
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+    cells = [{"row": r, "col": c, "row_span": 1, "col_span": 1, "text": text.strip()}
+             for r, row in enumerate(rows) for c, text in enumerate(row)]
+    yield 'p', f"Table 1: {os.path.splitext(name)[0]}", None
+    yield 'tbl', {"cells": cells, "rows": len(rows), "cols": max(map(len, rows), default=0), "header_rows": 1}, \
+        hashlib.sha1(data).hexdigest()
+
+# === Streaming Reader ===
+def iter_body_streaming(input_docx):
+    # Same output as iter_body_docx, read from word/document.xml with iterparse. Only the current paragraph or
+    # table is held in memory: finished body elements are cleared and detached as soon as they are emitted.
+    with zipfile.ZipFile(input_docx) as package, package.open("word/document.xml") as xml:
+        depth = 0
+        body = None
+        for event, el in ET.iterparse(xml, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2 and el.tag == W + "body":
+                    body = el
+                continue
+            depth -= 1
+            if depth != 2 or body is None:
+                continue
+            if el.tag == W + "p":
+                yield 'p', paragraph_text(el), None
+            elif el.tag == W + "tbl":
+                yield 'tbl', decode_table(el), element_digest(el)
+            el.clear()
+            body.remove(el)
+
+def extract_tables(input_docx, output_folder, streaming=False, known=None):
+    # Writes every table of one document as A{section}_Table_{n}_{title}.csv; returns {filename: table digest} and
+    # {filename: merged body cells} for tables that have any. Tables whose digest matches `known` (the previous
+    # run's result) and whose CSV still exists are not rewritten.
+    known = known or {}
+    tables, spans = {}, {}
+
+    # === State ===
+    section_id_counter = 0
+    table_in_section = 0
+    current_section_id = None
+    last_detected_title = None
+
+    # === Parse Document ===
+    source = open_source(input_docx)
+    if input_docx.lower().endswith(".csv"):
+        body = iter_body_csv(source, source_name(input_docx))
+    else:
+        body = iter_body_streaming(source) if streaming else iter_body_docx(source)
+    for tag, content, digest in body:
+        if tag == 'p':
+            text = content.strip()
+
+            # Detect "Table X: Title"
+            match = re.match(r"Table\s*(\d+)\s*:\s*(.+)", text, re.IGNORECASE)
+            if match:
+                table_number = int(match.group(1))
+                title = sanitize_filename(match.group(2))
+
+                if table_number == 1:
+                    section_id_counter += 1
+                    current_section_id = f"A{section_id_counter:02}"
+                    table_in_section = 1
+                else:
+                    table_in_section += 1
+
+                last_detected_title = title
+
+        elif tag == 'tbl':
+            # Handle cases with no title
+            if current_section_id is None:
                 section_id_counter += 1
                 current_section_id = f"A{section_id_counter:02}"
                 table_in_section = 1
-            else:
+
+            elif last_detected_title is None:
                 table_in_section += 1
 
-            last_detected_title = title
+            # Prepare filename
+            title_part = last_detected_title if last_detected_title else "Untitled"
+            filename = f"{current_section_id}_Table_{table_in_section}_{title_part}.csv"
+            os.makedirs(output_folder, exist_ok=True)
+            filepath = os.path.join(output_folder, filename)
+            tables[filename] = digest
+            last_detected_title = None
+
+            # Extract data
+            df, table_spans = table_frame(content)
+            if table_spans:
+                spans[filename] = table_spans
+            if known.get(filename) == digest and os.path.exists(filepath):
+                continue
+            df.to_csv(filepath, index=False)
+
+    return tables, spans
+
+# === Batch Mode ===
+def expand_inputs(inputs):
+    # Files, directories (recursive) and glob patterns -> unique .docx paths and zip member sources, in the order given
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(path for pattern in ("*.docx", "*.zip")
+                             for path in glob.glob(os.path.join(glob.escape(item), "**", pattern), recursive=True))
+        elif os.path.isfile(item):
+            matches = [item]
+        else:
+            matches = sorted(glob.glob(item, recursive=True))
+            if not matches:
+                print(f"⚠️ No documents match: {item}", file=sys.stderr)
+        sources = []
+        for path in matches:
+            if not path.lower().endswith(".zip"):
+                sources.append(path)
+                continue
+            try:
+                sources.extend(archive_members(path, path))
+            except (zipfile.BadZipFile, OSError) as e:
+                print(f"⚠️ Cannot read archive {path}: {e}", file=sys.stderr)
+        for source in sources:
+            # Skip Word's "~$name.docx" lock files and anything already listed
+            if not source_name(source).startswith("~$") and source_id(source) not in map(source_id, found):
+                found.append(source)
+    return found
+
+def source_id(source):
+    path, *members = split_source(source)
+    return MEMBER_SEP.join([os.path.abspath(path)] + members)
+
+def document_key(path, output_root):
+    # Manifest key: the document's path relative to the output root, so the manifest survives moving both;
+    # archive members keep their path inside the archive
+    path, *members = split_source(path)
+    return MEMBER_SEP.join([os.path.relpath(os.path.abspath(path), os.path.abspath(output_root)).replace(os.sep, "/")]
+                           + members)
+
+def document_folders(paths, output_root, manifest):
+    # One output folder per document, named after it and kept across runs; same-named documents get a suffix
+    documents = manifest["documents"]
+    folders = {}
+    used = {entry["folder"] for entry in documents.values()}
+    for path in paths:
+        entry = documents.get(document_key(path, output_root))
+        if entry is not None:
+            folders[path] = os.path.join(output_root, entry["folder"])
+            continue
+        base = sanitize_filename(os.path.splitext(source_name(path))[0]) or "document"
+        name, n = base, 2
+        while name in used:
+            name, n = f"{base}_{n}", n + 1
+        used.add(name)
+        folders[path] = os.path.join(output_root, name)
+    return folders
+
+def load_manifest(output_root):
+    path = os.path.join(output_root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"decoder": DECODER_VERSION, "documents": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def write_json(path, data):
+    # Written to a temp file first so readers never see half a file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def extract_document(path, output_folder, streaming=False, previous=None):
+    # Worker: never raises, so one broken document does not stop the batch.
+    # `previous` is the document's manifest entry from the last run, if any.
+    started = time.perf_counter()
+    previous = previous or {"sha256": None, "tables": {}}
+    known = previous["tables"]
+    result = {"file": path, "folder": output_folder, "status": "extracted", "added": [], "changed": [], "removed": [],
+              "tables": {}, "spans": previous.get("spans", {}), "sha256": None, "error": None}
+    try:
+        result["sha256"] = file_digest(path)
+        existing = {name for name in known if os.path.exists(os.path.join(output_folder, name))}
+        if result["sha256"] == previous["sha256"] and existing == set(known):
+            result.update(status="skipped", tables=known)
+        else:
+            tables, result["spans"] = extract_tables(path, output_folder, streaming, known)
+            result["tables"] = tables
+            result["added"] = sorted(name for name in tables if name not in known)
+            result["changed"] = sorted(name for name in tables if name in known
+                                       and (known[name] != tables[name] or name not in existing))
+            result["removed"] = sorted(name for name in known if name not in tables)
+            for name in result["removed"]:
+                if name in existing:
+                    os.remove(os.path.join(output_folder, name))
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}", tables=known, sha256=previous["sha256"])
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+def run_batch(paths, output_root, jobs=None, verbose=False, streaming=False, force=False):
+    manifest = load_manifest(output_root)
+    if force or manifest.get("decoder") != DECODER_VERSION:
+        manifest = {"decoder": DECODER_VERSION, "documents": {}}
+    folders = document_folders(paths, output_root, manifest)
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(extract_document, path, folders[path], streaming, manifest["documents"].get(document_key(path, output_root)))
+            for path in paths
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result["error"]:
+                status = f"❌ {result['error']}"
+            elif result["status"] == "skipped":
+                status = "⏭️ unchanged"
+            else:
+                status = f"✅ {len(result['tables'])} tables ({len(result['added']) + len(result['changed'])} written)"
+            print(f"{status} in {result['seconds']:.2f}s: {result['file']} -> {result['folder']}")
+            if verbose:
+                for name in result["added"] + result["changed"]:
+                    print(f"   Saved: {os.path.join(result['folder'], name)}")
+    results.sort(key=lambda r: paths.index(r["file"]))
+
+    # Failed documents keep their previous entry; documents not named in this run are left as they were
+    for result in results:
+        if result["sha256"] is not None:
+            manifest["documents"][document_key(result["file"], output_root)] = {
+                "sha256": result["sha256"],
+                "folder": os.path.relpath(result["folder"], output_root).replace(os.sep, "/"),
+                "tables": result["tables"],
+                "spans": result["spans"],
+            }
+    write_json(os.path.join(output_root, MANIFEST_NAME), manifest)
+    changes = {"generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+    for kind in ("added", "changed", "removed"):
+        changes[kind] = [
+            os.path.relpath(os.path.join(r["folder"], name), output_root).replace(os.sep, "/")
+            for r in results for name in r[kind]
+        ]
+    changes["unchanged_documents"] = [r["file"] for r in results if r["status"] == "skipped"]
+    changes["failed_documents"] = [r["file"] for r in results if r["status"] == "failed"]
+    write_json(os.path.join(output_root, CHANGES_NAME), changes)
+    return results
+
+# === Table Store ===
+def iter_extracted_tables(output_root, manifest):
+    # (document folder, CSV name, DataFrame of strings, merged cells, manifest key) for every table in the manifest,
+    # in document order
+    for key, entry in manifest["documents"].items():
+        for name in entry["tables"]:
+            path = os.path.join(output_root, entry["folder"], name)
+            if os.path.exists(path):
+                yield entry["folder"], name, pd.read_csv(path, dtype=str, keep_default_na=False), \
+                    entry.get("spans", {}).get(name, []), key
+
+def table_cells(document, name, df, spans=(), source=None):
+    # One row per cell: provenance, row/column position and span, header and value. Slots covered by a merged
+    # cell are kept with an empty value and a span of 0.
+    match = TABLE_FILE_RE.match(name)
+    section, number, title = match.groups() if match else (None, None, os.path.splitext(name)[0])
+    rows, cols = df.shape
+    row_span, col_span = np.ones((rows, cols), dtype=int), np.ones((rows, cols), dtype=int)
+    for row, col, down, across in spans:
+        row_span[row:row + down, col:col + across] = col_span[row:row + down, col:col + across] = 0
+        row_span[row, col], col_span[row, col] = down, across
+    return pd.DataFrame({
+        "document": document, "source": source, "section": section, "table_number": int(number) if number else None,
+        "title": title.replace("_", " ").strip(), "file": name,
+        "row_index": np.repeat(np.arange(rows), cols), "column_index": np.tile(np.arange(cols), rows),
+        "row_span": row_span.ravel(), "col_span": col_span.ravel(),
+        "column": list(df.columns) * rows, "value": df.to_numpy(dtype=object).ravel(),
+    }, columns=STORE_COLUMNS)
+
+def combined_table(store):
+    # Every table's rows under the union of all headers, like concatenating the CSVs: columns in order of first
+    # appearance, Source_File and Document after the first table's columns
+    if store.empty:
+        return pd.DataFrame()
+    combined = store.pivot(index=["document", "file", "row_index"], columns="column", values="value")
+    first = store.drop_duplicates(["document", "file", "row_index"])
+    combined = combined.reindex(index=pd.MultiIndex.from_frame(first[["document", "file", "row_index"]]),
+                                columns=store["column"].unique())
+    combined = combined.rename_axis(columns=None).reset_index()
+    split = store.loc[store["file"] == store["file"].iloc[0], "column"].nunique()
+    columns = list(combined.columns[3:])
+    order = columns[:split] + ["file", "document"] + columns[split:]
+    return combined[order].rename(columns={"file": "Source_File", "document": "Document"})
+
+def build_store(output_root, manifest, store_path, types=False):
+    # Rebuilt from the CSVs each run so documents skipped by the manifest are still included.
+    # Returns (cell rows, table count, typed columns) and writes the combined market table next to the manifest.
+    fmt = STORE_FORMATS[os.path.splitext(store_path)[1].lower()]
+    cells = [table_cells(*table) for table in iter_extracted_tables(output_root, manifest)]
+    store = pd.concat(cells, ignore_index=True) if cells else pd.DataFrame(columns=STORE_COLUMNS)
+    store["table_number"] = store["table_number"].astype("Int64")
+    typed_columns = 0
+    if types:
+        store, report = infer_column_types(store)
+        report.to_csv(os.path.join(output_root, TYPES_NAME), index=False)
+        typed_columns = int(report["typed"].sum())
+
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+    tmp = store_path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    if fmt == "parquet":
+        store.to_parquet(tmp, index=False)
+    else:
+        with sqlite3.connect(tmp) as conn:
+            store.to_sql("cells", conn, index=False)
+            conn.execute("CREATE INDEX idx_cells_table ON cells(document, file)")
+        conn.close()
+    os.replace(tmp, store_path)
+
+    if cells:
+        combined_table(store).to_csv(os.path.join(output_root, COMBINED_NAME), index=False)
+    return len(store), len(cells), typed_columns
+
+# === Type Inference ===
+def alternatives(words):
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+# "$1.2B", "USD 450M", "15–20%", "$50K - $2M", "2025-2030", "2010s", "6-12 months", "$28.5 billion by 2030"
+QUANTITY_RE = (
+    rf"^(?P<sign>[+\-−])?\s*(?P<cur1>{alternatives(CURRENCIES)})?\s*(?P<n1>\d[\d,]*(?:\.\d+)?)\s*"
+    rf"(?:(?P<m1>{alternatives(MAGNITUDES)})\b)?\s*(?P<p1>%)?"
+    rf"(?:\s*(?:-|–|—|to)\s*(?P<cur2>{alternatives(CURRENCIES)})?\s*(?P<n2>\d[\d,]*(?:\.\d+)?)\s*"
+    rf"(?:(?P<m2>{alternatives(MAGNITUDES)})\b)?\s*(?P<p2>%)?)?"
+    rf"\s*(?P<cur3>{alternatives(c for c in CURRENCIES if c.isalpha())}\b)?\s*(?P<rest>[^\d]*?(?:\d{{4}}[^\d]*)?)\s*$"
+)
+QUANTITY_MAX_WORDS = 4  # trailing words allowed after the number, e.g. "of revenue", "by 2030"
+
+def parse_quantities(values):
+    # Vectorized parse of cell strings -> kind (currency, percent, year, number or None), low, high and unit.
+    # A magnitude on one end of a range applies to both ("$2-3M"); single values have low == high, decades span
+    # ten years.
+    # Unmatched groups become "" so every part stays a string column: all-NaN columns are float, and .str on them
+    # raises (e.g. a column where no cell has a currency or trailing words)
+    parts = values.fillna("").astype(str).str.strip().str.extract(QUANTITY_RE, flags=re.IGNORECASE).fillna("")
+    n1 = pd.to_numeric(parts["n1"].str.replace(",", ""), errors="coerce")
+    n2 = pd.to_numeric(parts["n2"].str.replace(",", ""), errors="coerce")
+    m1, m2 = parts["m1"].str.lower().map(MAGNITUDES), parts["m2"].str.lower().map(MAGNITUDES)
+    low = n1 * m1.fillna(m2).fillna(1) * np.where(parts["sign"].isin(["-", "−"]), -1, 1)
+    high = (n2 * m2.fillna(m1).fillna(1)).fillna(low)
+    currency = parts["cur1"].where(parts["cur1"] != "", parts["cur2"].where(parts["cur2"] != "", parts["cur3"]))
+    currency = currency.str.lower().map(CURRENCIES)
+    percent = (parts["p1"] != "") | (parts["p2"] != "")
+    rest = parts["rest"].str.strip()
+
+    plain = currency.isna() & ~percent & m1.isna() & m2.isna() & ~parts["n1"].str.contains(r"[,.]")
+    decade = plain & n1.between(1900, 2100) & (n1 % 10 == 0) & n2.isna() & (rest.str.lower() == "s")
+    is_year = decade | (plain & n1.between(1900, 2100) & (rest == "") & (n2.isna() | n2.between(1900, 2100)))
+    high = high.where(~decade, low + 9)
+    kind = pd.Series(np.select([currency.notna(), percent, is_year], ["currency", "percent", "year"], "number"),
+                     index=values.index).where(n1.notna() & (rest.str.count(r"\S+") <= QUANTITY_MAX_WORDS))
+    first_word = rest.str.extract(r"^(\S+)", expand=False).fillna("").str.lower().str.strip(",;:.()")
+    unit = currency.where(kind == "currency", np.where(kind == "percent", "%", np.where(kind == "year", "year", "")))
+    unit = unit.where(kind != "number", first_word)
+    return pd.DataFrame({"kind": kind, "low": low.where(kind.notna()), "high": high.where(kind.notna()),
+                         "unit": unit.where(kind.notna())})
 
-    elif tag == 'tbl':
-        table = table_objects[table_obj_index]
-        table_obj_index += 1
+def infer_column_types(store):
+    # (typed store, report). Each table column gets the kind most of its non-empty cells parse as; when that share
+    # reaches TYPE_MIN_CONFIDENCE its matching cells get numeric low/high and a unit, everything else stays null.
+    keys = ["document", "file", "column"]
+    parsed = parse_quantities(store["value"])
+    cells = store[keys].assign(kind=parsed["kind"], unit=parsed["unit"],
+                               non_empty=store["value"].fillna("").str.strip() != "")
+    report = cells[cells["non_empty"]].groupby(keys, sort=False).size().rename("non_empty").reset_index()
+    counts = cells[cells["kind"].notna()].groupby(keys + ["kind"], sort=False).size().rename("parsed").reset_index()
+    best = counts.sort_values("parsed", ascending=False, kind="stable").drop_duplicates(keys)
+    units = cells[cells["kind"].notna()].groupby(keys + ["kind", "unit"], sort=False).size().rename("n").reset_index()
+    units = units.sort_values("n", ascending=False, kind="stable").drop_duplicates(keys + ["kind"]).drop(columns="n")
+    report = report.merge(best, on=keys, how="left").merge(units, on=keys + ["kind"], how="left")
+    report["kind"] = report["kind"].fillna("text")
+    report["parsed"] = report["parsed"].fillna(0).astype(int)
+    report["confidence"] = (report["parsed"] / report["non_empty"]).round(3)
+    report["typed"] = (report["kind"] != "text") & (report["confidence"] >= TYPE_MIN_CONFIDENCE)
 
-        # Handle cases with no title
-        if current_section_id is None:
-            section_id_counter += 1
-            current_section_id = f"A{section_id_counter:02}"
-            table_in_section = 1
+    accepted = report.loc[report["typed"], keys + ["kind"]].rename(columns={"kind": "column_kind"})
+    column_kind = store[keys].merge(accepted, on=keys, how="left")["column_kind"].to_numpy()
+    matches = parsed["kind"].to_numpy() == column_kind
+    typed = store.assign(kind=np.where(matches, column_kind, None), low=parsed["low"].where(matches),
+                         high=parsed["high"].where(matches), unit=parsed["unit"].where(matches))
+    return typed, report[keys + ["kind", "unit", "non_empty", "parsed", "confidence", "typed"]]
 
-        elif last_detected_title is None:
-            table_in_section += 1
+def load_store(store_path):
+    # The whole store in one read, one row per cell
+    if STORE_FORMATS[os.path.splitext(store_path)[1].lower()] == "parquet":
+        return pd.read_parquet(store_path)
+    with sqlite3.connect(store_path) as conn:
+        store = pd.read_sql("SELECT * FROM cells", conn)
+    conn.close()
+    return store
 
-        # Prepare filename
-        title_part = last_detected_title if last_detected_title else "Untitled"
-        filename = f"{current_section_id}_Table_{table_in_section}_{title_part}.csv"
-        filepath = os.path.join(output_folder, filename)
+def store_tables(store):
+    # {(document, file): DataFrame} rebuilt from the long cell rows, columns in their original order
+    tables = {}
+    for key, cells in store.groupby(["document", "file"], sort=False):
+        wide = cells.pivot(index="row_index", columns="column_index", values="value")
+        wide.columns = cells.drop_duplicates("column_index").set_index("column_index")["column"].reindex(wide.columns)
+        tables[key] = wide.rename_axis(index=None, columns=None).reset_index(drop=True)
+    return tables
 
-        # Extract data
-        data = []
-        for row in table.rows:
-            data.append([cell.text.strip() for cell in row.cells])
+def print_summary(results, elapsed):
+    summary = pd.DataFrame([
+        {"file": r["file"], "status": r["status"], "tables": len(r["tables"]),
+         "written": len(r["added"]) + len(r["changed"]), "removed": len(r["removed"]),
+         "seconds": round(r["seconds"], 2), "error": r["error"]}
+        for r in results
+    ])
+    print()
+    print(summary.to_string(index=False))
+    counts = summary["status"].value_counts()
+    print(f"\n{summary['tables'].sum()} tables in {len(summary)} documents: {counts.get('extracted', 0)} extracted, "
+          f"{counts.get('skipped', 0)} unchanged, {counts.get('failed', 0)} failed; {summary['written'].sum()} CSVs "
+          f"written, {summary['removed'].sum()} removed in {elapsed:.2f}s wall, {summary['seconds'].sum():.2f}s total per file")
 
-        try:
-            df = pd.DataFrame(data[1:], columns=data[0])
-        except Exception:
-            df = pd.DataFrame(data)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract every table of one or more .docx files or zip bundles to CSV")
+    parser.add_argument("inputs", nargs="*", default=[input_docx],
+                        help="Documents, zip archives, directories or glob patterns (default: %(default)s)")
+    parser.add_argument("-o", "--output", default=output_folder, help="Output root folder (default: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="List every CSV written")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and re-extract every document")
+    parser.add_argument("--store", default=None,
+                        help=f"Also write every table to one dataset ({', '.join(STORE_FORMATS)}) plus {COMBINED_NAME}")
+    parser.add_argument("--types", action="store_true",
+                        help=f"With --store, parse money, percentages, ranges and years into numeric columns "
+                             f"and report per-column confidence in {TYPES_NAME}")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Read word/document.xml incrementally instead of loading the document; memory stays flat")
+    args = parser.parse_args(argv)
+    if args.store and os.path.splitext(args.store)[1].lower() not in STORE_FORMATS:
+        parser.error(f"--store must end in one of {', '.join(STORE_FORMATS)}")
+    if args.types and not args.store:
+        parser.error("--types needs --store")
 
-        df.to_csv(filepath, index=False)
-        print(f"✅ Saved: {filepath}")
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("No .docx documents or zip members found", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    results = run_batch(paths, args.output, args.jobs, args.verbose, args.streaming, args.force)
+    print_summary(results, time.perf_counter() - started)
+    if args.store:
+        started = time.perf_counter()
+        cells, tables, typed = build_store(args.output, load_manifest(args.output), args.store, args.types)
+        print(f"🗄️ {tables} tables ({cells} cells) -> {args.store} and "
+              f"{os.path.join(args.output, COMBINED_NAME)} in {time.perf_counter() - started:.2f}s")
+        if args.types:
+            print(f"🔢 {typed} typed columns, report: {os.path.join(args.output, TYPES_NAME)}")
+    return 1 if any(r["error"] for r in results) else 0
 
-        last_detected_title = None
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from extract_docx_tables import infer_column_types, parse_quantities
+
+
+def test_parse_quantities_without_trailing_words():
+    # No cell has text after its number, so the rest/unit columns are all empty
+    parsed = parse_quantities(pd.Series(["$2M", "1"]))
+    assert parsed["kind"].tolist() == ["currency", "number"]
+    assert parsed["low"].tolist() == [2e6, 1.0]
+    assert parsed["unit"].tolist() == ["USD", ""]
+
+
+def test_parse_quantities_without_any_match():
+    parsed = parse_quantities(pd.Series(["High", "Low", ""]))
+    assert parsed["kind"].isna().all()
+
+
+def test_infer_column_types_bare_number_column():
+    store = pd.DataFrame({"document": "doc", "file": "A01_Table_1_Counts.csv", "column": ["Clinics"] * 3,
+                          "value": ["12", "7", "30"]})
+    typed, report = infer_column_types(store)
+    assert report["kind"].tolist() == ["number"]
+    assert report["typed"].tolist() == [True]
+    assert typed["low"].tolist() == [12.0, 7.0, 30.0]
@@ -0,0 +1,1607 @@
+"""Headless core of the Paint Industry News Tracker: feeds, classification, article store and the ingest CLI.
+
+Run `python -m news_tracker ingest --interval 10m` next to this file to keep news_cache.db fresh;
+news_tracker_mvp.py only reads from it. Articles older than the feed scan window move to
+month-partitioned Parquet files in news_cache_archive/ (see `python -m news_tracker archive`).
+"""
+import pandas as pd
+import feedparser
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+import http.client
+import html
+import email.utils
+import urllib.parse
+import threading
+import zlib
+import hashlib
+import sqlite3
+import json
+import time
+import re
+import struct
+import unicodedata
+import argparse
+import sys
+import logging
+import shutil
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("NEWS_TRACKER_DB", os.path.join(BASE_DIR, "news_cache.db"))
+CSV_PATH = os.path.join(BASE_DIR, "news_cache.csv")  # legacy cache, imported into DB_PATH whenever it changes
+DEFAULT_INTERVAL = "10m"
+
+# Feed fetching: bounded worker pool, per-feed timeouts and a deadline for the whole scan
+FETCH_WORKERS = 8
+FEED_CONNECT_TIMEOUT = 5
+FEED_READ_TIMEOUT = 15
+FETCH_DEADLINE = 45
+MAX_REDIRECTS = 5
+MAX_FEED_BYTES = 5 * 1024 * 1024  # decompressed body cap per response
+MAX_CONNECTIONS_PER_HOST = 2  # several feeds share masrawy.com, youm7.com, elbalad.news, ...
+MAX_IDLE_PER_HOST = 2
+USER_AGENT = "PaintNewsTracker/1.0 (+https://github.com/Mahmoud-Ali91/Portfolio)"
+INGEST_DAYS = 180  # feeds are always scanned over the slider's maximum window
+
+# Adaptive polling: each feed's interval follows its publish rate, within a global request budget
+MIN_POLL_INTERVAL = 5 * 60
+MAX_POLL_INTERVAL = 6 * 3600
+DEFAULT_POLL_INTERVAL = 30 * 60
+POLL_FRACTION = 0.5  # poll twice per typical gap between entries
+RATE_SMOOTHING = 0.3  # weight of the newest inter-arrival estimate
+UNCHANGED_BACKOFF = 1.5
+REQUEST_BUDGET_PER_HOUR = 120
+DEFAULT_TICK = "1m"
+
+RSS_FEEDS = {
+    # Business & Economy
+    "Enterprise Press": "https://enterprise.press/feed/",
+    "Al Mal News": "https://www.almalnews.com/feed/",
+    "Amwal Al Ghad": "https://amwalalghad.com/feed/",
+    "Mubasher Info (English)": "https://english.mubasher.info/rss/",
+    "Mubasher Info (Arabic)": "https://arabic.mubasher.info/rss/",
+    "Daily News Egypt": "https://www.dailynewsegypt.com/feed/",
+    "Egypt Independent": "https://www.egyptindependent.com/feed/",
+    "Business Today Egypt": "https://www.businesstodayegypt.com/rss/",
+    "Masrawy Economy": "https://www.masrawy.com/rss/SectionRSS?secId=100204",
+    "Al Borsa News": "https://alborsanews.com/feed",
+    "Al Dostor Economy": "https://www.dostor.org/rss.aspx?SecId=4",
+    "Akhbar El Yom Economy": "https://akhbarelyom.com/rss?sectionId=69",
+    "Al Watan Economy": "https://www.elwatannews.com/rss/section/77",
+    "Youm7 Economy": "https://www.youm7.com/rss/SectionRss?SectionID=297",
+    "Sada Elbalad Economy": "https://www.elbalad.news/rss.aspx?sectionid=22",
+    "Al Ahram Economy": "https://gate.ahram.org.eg/rss/96.aspx",
+    "El Fagr Economy": "https://www.elfagr.org/rss/sections/24",
+    "Veto Gate Economy": "https://www.vetogate.com/rss/Section/3",
+    "Cairo 24 Economy": "https://www.cairo24.com/rss/Section/5",
+    "Masrawy Real Estate": "https://www.masrawy.com/rss/SectionRSS?secId=100209",
+    # Construction & Real Estate
+    "Construction Week Online ME": "https://www.constructionweekonline.com/rss",
+    "Al Bawaba Real Estate": "https://www.albawabhnews.com/rss/section/18",
+    "Al Masdar Real Estate": "https://almasdar.com/rss/section/6",
+    # General News (for broader coverage)
+    "Al Ahram": "https://gate.ahram.org.eg/rss/",
+    "Al Masry Al Youm": "https://www.almasryalyoum.com/rss/rssfeeds",
+    "Youm7": "https://www.youm7.com/rss/SectionRss?SectionID=65",
+    "Sada Elbalad": "https://www.elbalad.news/rss.aspx",
+    "El Watan": "https://www.elwatannews.com/rss/",
+    "Masr Alarabia": "https://www.masralarabia.com/rss",
+    "Mada Masr": "https://www.madamasr.com/en/feed",
+    "Masress": "https://masress.com/en/rss"
+}
+
+# One-word, market-research-relevant keywords for the Egyptian paint market
+CATEGORIES = {
+    "Brands": [
+        "National", "ناشيونال", "GLC", "جى", "باكين", "Pachin", "سايبس", "Sipes", "سكيب", "Scib", "ميدو", "Mido"
+    ],
+    "Products": [
+        "دهان", "paint", "طلاء", "enamel", "epoxy", "إيبوكسي", "acrylic", "أكريليك", "ورنيش", "varnish"
+    ],
+    "Materials": [
+        "pigment", "صبغة", "راتنج", "resin", "solvent", "مذيب", "titanium", "تيتانيوم", "oxide", "أكسيد"
+    ],
+    "Construction": [
+        "بناء", "construction", "عقارات", "real", "estate", "إسكان", "infrastructure", "بنية", "مشروع", "project"
+    ],
+    "Automotive": [
+        "سيارة", "car", "automotive", "مركبة", "vehicle", "طلاء", "دهان"
+    ],
+    "Regulation": [
+        "قانون", "regulation", "معيار", "standard", "مواصفة", "specification", "VOC", "وزارة", "ministry"
+    ],
+    "Innovation": [
+        "ابتكار", "innovation", "تطوير", "development", "بحث", "research", "تقنية", "technology", "صديق", "eco"
+    ],
+    "Trends": [
+        "موضة", "trend", "ألوان", "color", "ديكور", "design", "سوق", "market", "طلب", "demand"
+    ]
+}
+
+# --- Arabic-aware Text Normalization ---
+ARABIC_DIACRITICS_RE = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")  # tashkeel + tatweel
+ARABIC_LETTER_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي",
+    "ؤ": "و",
+    "ة": "ه",
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+})
+TOKEN_RE = re.compile(r"[^\W_]+")
+ARABIC_PROCLITIC_RE = re.compile(r"^[وف]?(?:لل|[بكل]?ال|[بكل])")
+ARABIC_SUFFIXES = ("ات", "ون", "ين")
+ENGLISH_SUFFIXES = (("ing", 4), ("ies", 3), ("es", 3), ("ed", 4), ("s", 3))  # (suffix, shortest stem left after stripping)
+ENGLISH_ENDINGS = {"ies": "y"}  # what replaces a stripped suffix: ministries -> ministry
+ENGLISH_SIBILANTS = ("s", "x", "z", "ch", "sh")  # "es" is only stripped after these: boxes -> box, cares -/-> car
+STEMS_VERSION = "3"  # bump when token_variants changes so the full-text stems column is rebuilt
+
+def normalize_text(text):
+    # NFKC, casefold, drop tashkeel/tatweel and unify alef, yaa, hamza carriers and taa marbuta
+    text = unicodedata.normalize("NFKC", str(text or "")).casefold()
+    return ARABIC_DIACRITICS_RE.sub("", text).translate(ARABIC_LETTER_MAP)
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize_text(text))
+
+@lru_cache(maxsize=200_000)
+def token_variants(token):
+    # The token itself plus light stems: Arabic proclitics (و, ف, ب, ك, ل, ال) and plural suffixes, English inflections
+    variants = [token]
+    if "\u0600" <= token[0] <= "\u06ff":
+        stem = ARABIC_PROCLITIC_RE.sub("", token)
+        if len(stem) >= 2 and stem != token:
+            variants.append(stem)
+        for base in list(variants):
+            for suffix in ARABIC_SUFFIXES:
+                if base.endswith(suffix) and len(base) - len(suffix) >= 3:
+                    variants.append(base[:-len(suffix)])
+    else:
+        for suffix, shortest in ENGLISH_SUFFIXES:
+            base = token[:-len(suffix)]
+            if token.endswith(suffix) and len(base) >= shortest and (suffix != "es" or base.endswith(ENGLISH_SIBILANTS)):
+                variants.append(base + ENGLISH_ENDINGS.get(suffix, ""))
+    return tuple(variants)
+
+def stem(token):
+    # Most reduced variant; used to index and query the full-text stems column symmetrically
+    return min(token_variants(token), key=len)
+
+# --- Summary Cleaning (once, at ingest) ---
+SUMMARY_MAX_CHARS = 400
+HTML_SKIP_RE = re.compile(r"<(script|style)\b.*?</\1\s*>|<!--.*?-->", re.S | re.IGNORECASE)
+HTML_BREAK_RE = re.compile(r"<(?:br|/p|/div|/li|/h\d)\b[^>]*>", re.IGNORECASE)
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+# Publisher boilerplate, matched on the plain text
+BOILERPLATE_RES = [
+    re.compile(r"The post .{0,300}? (?:first appeared on|appeared first on) .{0,120}?\.?\s*$", re.S),  # WordPress
+    re.compile(r"\s*(?:Continue reading|Read more)\s*(?:→|»|\.\.\.|…)?\s*$", re.IGNORECASE),
+    re.compile(r"\s*(?:اقرأ|إقرأ|اقرا) (?:أيضا|أيضاً|ايضا)\s*[:：]?.*$", re.S),  # "read also" link lists
+]
+ELLIPSIS_RE = re.compile(r"\s*\[(?:…|\.\.\.)\]")
+
+def clean_summary(raw, max_chars=SUMMARY_MAX_CHARS):
+    # Feed HTML -> bounded plain text: tags and publisher boilerplate dropped, entities decoded, cut at a word
+    text = HTML_TAG_RE.sub(" ", HTML_BREAK_RE.sub("\n", HTML_SKIP_RE.sub(" ", str(raw or ""))))
+    text = ELLIPSIS_RE.sub("…", html.unescape(text))
+    paragraphs = [" ".join(line.split()) for line in text.splitlines()]
+    text = "\n".join(p for p in paragraphs if p)
+    for boilerplate in BOILERPLATE_RES:
+        text = boilerplate.sub("", text).strip()
+    text = text.replace("\n", " ")
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0].rstrip(" ,.;:،") + "…"
+    return text
+
+# --- Keyword Classifier (token index) ---
+class KeywordMatcher:
+    """Index of every normalized keyword of every category; tags an article by set lookups on its tokens."""
+
+    def __init__(self, categories):
+        self.index = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                for token in tokenize(keyword):
+                    self.index.setdefault(token, set()).add((category, keyword))
+
+    def classify_tokens(self, tokens):
+        # Returns {category: set of matched keywords}
+        tags = {}
+        index = self.index
+        for token in set(tokens):
+            for variant in token_variants(token):
+                for category, keyword in index.get(variant, ()):
+                    tags.setdefault(category, set()).add(keyword)
+        return tags
+
+    def classify(self, text):
+        return self.classify_tokens(tokenize(text))
+
+CLASSIFIER = KeywordMatcher(CATEGORIES)
+
+@lru_cache(maxsize=4096)
+def parse_date_text(text):
+    # RFC-822 (RSS) or ISO-8601 (Atom) -> aware UTC datetime, or None; far cheaper than pd.to_datetime
+    text = text.strip()
+    try:
+        dt = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(text[:-1] + "+00:00" if text.endswith(("Z", "z")) else text)
+        except ValueError:
+            return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+def parse_datetime(entry):
+    # Always return timezone-aware UTC datetime
+    for key in ["published_parsed", "updated_parsed"]:
+        if key in entry and entry[key]:
+            try:
+                return datetime(*entry[key][:6], tzinfo=timezone.utc)
+            except Exception:
+                continue
+    for key in ["published", "updated"]:
+        if key in entry and entry[key]:
+            dt = parse_date_text(entry[key])
+            if dt is not None:
+                return dt
+            try:
+                dt = pd.to_datetime(entry[key], utc=True)
+                return dt.to_pydatetime()
+            except Exception:
+                continue
+    return datetime.now(timezone.utc)
+
+# --- HTTP Client (pooled keep-alive connections, compression, size caps) ---
+class ResponseTooLarge(IOError):
+    pass
+
+class HttpClient:
+    """Thread-safe GET client: reuses connections per host, limits concurrent requests per host,
+    negotiates gzip/deflate and refuses bodies larger than max_bytes."""
+
+    RETRYABLE = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+    def __init__(self, connect_timeout=FEED_CONNECT_TIMEOUT, read_timeout=FEED_READ_TIMEOUT,
+                 max_bytes=MAX_FEED_BYTES, per_host=MAX_CONNECTIONS_PER_HOST, max_idle=MAX_IDLE_PER_HOST):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = max_bytes
+        self.per_host = per_host
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+
+    def _host_slot(self, key):
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[key]
+
+    def _checkout(self, key):
+        # Returns (connection, reused)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, netloc = key
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conn_cls(netloc, timeout=self.connect_timeout)
+        conn.connect()
+        return conn, False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _read_body(self, resp, stats):
+        encoding = (resp.getheader("Content-Encoding") or "identity").strip().lower()
+        length = resp.getheader("Content-Length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            raise ResponseTooLarge(f"Content-Length {length} exceeds {self.max_bytes} bytes")
+        if encoding in ("gzip", "x-gzip", "deflate"):
+            decoder = zlib.decompressobj(zlib.MAX_WBITS | 32)  # gzip or zlib header, auto-detected
+        else:
+            decoder = None
+        chunks, size = [], 0
+        while True:
+            chunk = resp.read(64 * 1024)
+            if not chunk:
+                break
+            stats["bytes"] = stats.get("bytes", 0) + len(chunk)
+            if decoder is not None:
+                try:
+                    chunk = decoder.decompress(chunk, self.max_bytes - size + 1)
+                except zlib.error:
+                    if size or encoding != "deflate":
+                        raise
+                    decoder = zlib.decompressobj(-zlib.MAX_WBITS)  # some servers send raw deflate
+                    chunk = decoder.decompress(chunk, self.max_bytes - size + 1)
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise ResponseTooLarge(f"Body exceeds {self.max_bytes} bytes")
+            chunks.append(chunk)
+        if decoder is not None:
+            chunks.append(decoder.flush())
+        return b"".join(chunks)
+
+    def _request(self, key, path, headers, stats):
+        for attempt in range(2):
+            conn, reused = self._checkout(key)
+            try:
+                conn.sock.settimeout(self.read_timeout)
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = self._read_body(resp, stats)
+            except self.RETRYABLE:
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # the server dropped an idle keep-alive connection
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return resp, body
+
+    def get(self, url, headers=None, stats=None):
+        # Returns (status, lowercase headers, body), following redirects; stats["bytes"] counts bytes on the wire
+        stats = {} if stats is None else stats
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            key = (parts.scheme, parts.netloc.lower())
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            request_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate", **(headers or {})}
+            with self._host_slot(key):
+                resp, body = self._request(key, path, request_headers, stats)
+            location = resp.getheader("Location")
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            response_headers = {k.lower(): v for k, v in resp.getheaders()}
+            response_headers.pop("content-encoding", None)  # body is already decoded
+            return resp.status, response_headers, body
+        raise IOError(f"Too many redirects for {url}")
+
+HTTP_CLIENT = HttpClient()
+
+def http_get(url, headers=None, stats=None):
+    return HTTP_CLIENT.get(url, headers, stats)
+
+# --- Feed State (conditional GET validators) ---
+NEWEST_ENTRY_RE = re.compile(rb"<(item|entry)[\s>].*?</\1>", re.S)
+ENTRY_DATE_RE = re.compile(rb"<(pubDate|published|updated|dc:date)>\s*(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?\s*</\1>", re.S)
+EARLY_EXIT_RUN = 3  # consecutive old entries before the rest of a feed is dropped; tolerates loosely ordered feeds
+WATERMARK_SLACK = timedelta(days=1)  # entries back-dated a little behind the newest one seen last time
+
+def scan_scope(days_back=INGEST_DAYS):
+    # Validators only prove "nothing new" for the same keyword lists and look-back window
+    return hashlib.sha1(json.dumps([CATEGORIES, days_back], ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+def entry_date(entry):
+    # Publish time of a raw <item>/<entry> block, read with a regex; None when missing or unreadable
+    match = ENTRY_DATE_RE.search(entry)
+    return parse_date_text(match.group(2).decode("utf-8", "replace")) if match else None
+
+def newest_entry_digest(body):
+    # Hash of the first <item>/<entry> block, found without parsing the feed. Only trusted when every entry
+    # is dated and they run newest first; oldest-first feeds or pinned items return None (always parse).
+    entries = [match.group(0) for match in NEWEST_ENTRY_RE.finditer(body)]
+    dates = [entry_date(entry) for entry in entries]
+    if not entries or None in dates or any(later > earlier for earlier, later in zip(dates, dates[1:])):
+        return None
+    return hashlib.sha1(entries[0]).hexdigest()
+
+def truncate_old_entries(body, cutoff):
+    # Cuts the raw feed after the first EARLY_EXIT_RUN entries in a row published before `cutoff`, so
+    # feedparser only sees the head of large feeds. Entry dates are read with a regex, not a parser.
+    # Only newest-first feeds are cut: once a dated entry is newer than the one before it (oldest-first
+    # feeds, pinned items) the whole body is kept, since fresh entries may still follow.
+    run, previous = 0, None
+    for match in NEWEST_ENTRY_RE.finditer(body):
+        published = entry_date(match.group(0))
+        if published is not None:
+            if previous is not None and published > previous:
+                return body
+            previous = published
+        run = run + 1 if published is not None and published < cutoff else 0
+        if run >= EARLY_EXIT_RUN:
+            tag = match.group(1)
+            tail = body.rfind(b"</" + tag + b">") + len(tag) + 3
+            return body[:match.end()] + body[tail:]
+    return body
+
+def fetch_feed(url, cached=None, stats=None, time_limit=None):
+    # Returns (feed, state); feed is None when the server or the newest entry says nothing changed.
+    # With time_limit, entries older than it and than the last newest entry seen are not parsed.
+    # `stats` receives the HTTP status, wire bytes and any feed parse error.
+    cached = cached or {}
+    stats = {} if stats is None else stats
+    request_headers = {}
+    if cached.get("etag"):
+        request_headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        request_headers["If-Modified-Since"] = cached["last_modified"]
+    status, headers, body = http_get(url, request_headers, stats)
+    stats["status"] = status
+    if status == 304:
+        return None, cached
+    if status >= 400:
+        raise IOError(f"HTTP {status}")
+    state = {
+        "etag": headers.get("etag"),
+        "last_modified": headers.get("last-modified"),
+        "newest": newest_entry_digest(body),
+        "newest_at": cached.get("newest_at"),
+    }
+    if state["newest"] is not None and state["newest"] == cached.get("newest"):
+        return None, state
+    if time_limit is not None:
+        cutoff = time_limit
+        if cached.get("newest_at"):
+            cutoff = max(cutoff, datetime.fromisoformat(cached["newest_at"]) - WATERMARK_SLACK)
+        body = truncate_old_entries(body, cutoff)
+    feed = feedparser.parse(body, response_headers=headers)
+    if feed.get("bozo"):
+        stats["parse_error"] = repr(feed.get("bozo_exception"))
+    return feed, state
+
+def timed_fetch(url, cached, time_limit=None):
+    # fetch_feed for the worker pool: never raises, always reports latency
+    stats = {}
+    started = time.monotonic()
+    try:
+        feed, state = fetch_feed(url, cached, stats, time_limit)
+        error = None
+    except Exception as e:
+        feed, state, error = None, None, e
+    stats["latency_ms"] = (time.monotonic() - started) * 1000
+    return feed, state, error, stats
+
+def iter_feeds(feeds=None, deadline=FETCH_DEADLINE, max_workers=FETCH_WORKERS, state=None, scope=None, time_limit=None):
+    # Yields (source, feed, feed_state, error, stats) in completion order; feeds still running at the deadline are
+    # reported as timed out, and so are finished ones not yet handed over by then, because the consumer's own
+    # work runs inside this loop. feed is None for unchanged feeds. feed_state is the source's entry in `state`
+    # merged with the new validators; `state` itself is left alone so nothing is committed before the items are stored.
+    deadline_at = time.monotonic() + deadline
+    feeds = RSS_FEEDS if feeds is None else feeds
+    state = {} if state is None else state
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {}
+    for source, url in feeds.items():
+        cached = state.get(source, {})
+        cached = cached if cached.get("scope") == scope else None
+        futures[executor.submit(timed_fetch, url, cached, time_limit)] = source
+    pending = set(futures.values())
+    running = set(futures)
+    try:
+        while running and time.monotonic() < deadline_at:
+            done, running = wait(running, timeout=max(0, deadline_at - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                if time.monotonic() >= deadline_at:
+                    break
+                source = futures[future]
+                pending.discard(source)
+                feed, fetched, error, stats = future.result()
+                feed_state = dict(state.get(source, {}))
+                if error is None:
+                    feed_state.update(fetched, scope=scope, checked_at=datetime.now(timezone.utc).isoformat())
+                yield source, feed, feed_state, error, stats
+        for source in sorted(pending):
+            error = TimeoutError(f"No response within {deadline}s")
+            yield source, None, dict(state.get(source, {})), error, {"latency_ms": deadline * 1000}
+    finally:
+        # Do not wait on stragglers; their own socket timeouts will end them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def classify_entries(feed, source, time_limit):
+    # Returns (matching items, publish times of all entries)
+    results = []
+    published = []
+    for entry in feed.entries:
+        published_dt = parse_datetime(entry)
+        published.append(published_dt)
+        if published_dt < time_limit:
+            continue
+        item = prepare_article({
+            "timestamp": published_dt,
+            "title": entry.get("title", ""),
+            "summary": entry.get("summary", ""),
+            "link": entry.get("link", ""),
+            "source": source
+        })
+        if item["tags"]:
+            results.append(item)
+    return results, published
+
+def prepare_article(item):
+    # Cleans, normalizes and classifies an article once, at ingest
+    item["summary_text"] = clean_summary(item.get("summary"))
+    title_tokens = tokenize(item.get("title"))
+    summary_tokens = tokenize(item["summary_text"])
+    tags = CLASSIFIER.classify_tokens(title_tokens + summary_tokens)
+    item["title_norm"] = " ".join(title_tokens)
+    item["summary_norm"] = " ".join(summary_tokens)
+    item["tags"] = tags
+    item["keyword"] = ", ".join(sorted({kw for kws in tags.values() for kw in kws}))
+    return item
+
+def iter_rss_news(days_back=INGEST_DAYS, deadline=FETCH_DEADLINE, store=None, feeds=None):
+    # Streams (source, classified items, error, stats, feed_state) as each feed finishes. feed_state carries the
+    # new validators and next poll time; the caller saves it with save_feed_state only once the items are stored,
+    # otherwise the next run would see a 304 or an unchanged newest entry and skip them for good.
+    time_limit = datetime.now(timezone.utc) - timedelta(days=days_back)
+    own_store = store is None
+    store = open_store() if own_store else store
+    try:
+        state = load_feed_state(store)
+        scope = scan_scope(days_back)
+        for source, feed, feed_state, error, stats in iter_feeds(feeds, deadline=deadline, state=state, scope=scope, time_limit=time_limit):
+            if error is not None:
+                items = []
+                schedule_next_poll(feed_state, "error")
+            elif feed is None:
+                items = []
+                schedule_next_poll(feed_state, "unchanged")
+            else:
+                items, published = classify_entries(feed, source, time_limit)
+                stats["entries"] = len(feed.entries)
+                if published:
+                    feed_state["newest_at"] = max(published).isoformat()
+                schedule_next_poll(feed_state, "parsed", published)
+            if error is None and feed_state.get("newest_at"):
+                newest_at = datetime.fromisoformat(feed_state["newest_at"])
+                stats["newest_age_s"] = (datetime.now(timezone.utc) - newest_at).total_seconds()
+            yield source, items, error, stats, feed_state
+    finally:
+        if own_store:
+            store.close()
+
+# --- Adaptive Poll Scheduler ---
+def mean_inter_arrival(published, max_entries=20):
+    # Average gap in seconds between the newest entries, or None if it cannot be estimated
+    recent = sorted(published, reverse=True)[:max_entries]
+    if len(recent) < 2:
+        return None
+    span = (recent[0] - recent[-1]).total_seconds()
+    return span / (len(recent) - 1) if span > 0 else None
+
+def schedule_next_poll(feed_state, outcome, published=(), now=None):
+    # outcome: "parsed" (learn from entry times), "unchanged" (304 / same newest entry) or "error"
+    now = now or datetime.now(timezone.utc)
+    learned = feed_state.get("learned_interval_s") or DEFAULT_POLL_INTERVAL
+    interval = feed_state.get("poll_interval_s") or learned
+    failures = feed_state.get("failures") or 0
+    if outcome == "parsed":
+        gap = mean_inter_arrival(published)
+        if gap is not None:
+            learned = (1 - RATE_SMOOTHING) * learned + RATE_SMOOTHING * gap * POLL_FRACTION
+        learned = min(max(learned, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+        interval, failures = learned, 0
+    elif outcome == "unchanged":
+        interval, failures = interval * UNCHANGED_BACKOFF, 0
+    else:
+        failures += 1
+        interval = learned * 2 ** failures
+    interval = min(max(interval, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+    feed_state.update({
+        "learned_interval_s": learned,
+        "poll_interval_s": interval,
+        "failures": failures,
+        "next_poll_at": (now + timedelta(seconds=interval)).isoformat()
+    })
+    return interval
+
+def due_feeds(conn, budget_per_hour=REQUEST_BUDGET_PER_HOUR, now=None):
+    # Feeds whose next poll time has passed, most overdue (relative to their interval) first,
+    # trimmed to what is left of the hourly request budget
+    now = now or datetime.now(timezone.utc)
+    used = conn.execute(
+        "SELECT COUNT(*) FROM feed_runs WHERE run_at >= ?", ((now - timedelta(hours=1)).isoformat(),)
+    ).fetchone()[0]
+    allowance = max(0, budget_per_hour - used)
+    state = load_feed_state(conn)
+    candidates = []
+    for source in RSS_FEEDS:
+        feed_state = state.get(source, {})
+        if not feed_state.get("next_poll_at"):
+            candidates.append((float("inf"), source))
+            continue
+        next_poll_at = datetime.fromisoformat(feed_state["next_poll_at"])
+        if next_poll_at <= now:
+            interval = feed_state.get("poll_interval_s") or DEFAULT_POLL_INTERVAL
+            candidates.append(((now - next_poll_at).total_seconds() / interval, source))
+    candidates.sort(reverse=True)
+    return [source for _, source in candidates[:allowance]]
+
+def fetch_rss_news(days_back=INGEST_DAYS):
+    results = []
+    for _, items, _, _, _ in iter_rss_news(days_back):
+        results.extend(items)
+    return results
+
+# --- Near-duplicate Detection (MinHash LSH) ---
+SHINGLE_SIZE = 2
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard almost always share a band
+DUPLICATE_THRESHOLD = 0.5  # estimated Jaccard similarity of title+summary shingles
+CLUSTER_WINDOW_DAYS = 3  # syndicated copies land within days; keeps recurring headlines apart
+CLUSTER_MAX_CANDIDATES = 200
+MERSENNE_PRIME = (1 << 61) - 1
+MINHASH_SEEDS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % (MERSENNE_PRIME - 1) + 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % MERSENNE_PRIME)
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+def shingles(tokens, size=SHINGLE_SIZE):
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+def minhash(tokens):
+    # MinHash signature (tuple of 32-bit values) over word shingles; None for empty text
+    features = shingles(tokens)
+    if not features:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big") for f in features]
+    return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) & 0xFFFFFFFF for a, b in MINHASH_SEEDS)
+
+def lsh_bands(signature):
+    # One bucket key per band, as a signed 64-bit SQLite INTEGER
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    keys = []
+    for band in range(LSH_BANDS):
+        digest = hashlib.blake2b(struct.pack(f"<{rows}I", *signature[band * rows:(band + 1) * rows]), digest_size=8).digest()
+        keys.append((band, int.from_bytes(digest, "big", signed=True)))
+    return keys
+
+def signature_similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / MINHASH_PERMUTATIONS
+
+# --- Article Store (SQLite, WAL) ---
+TRACKING_PARAMS_RE = re.compile(r"^(utm_\w+|fbclid|gclid)$", re.IGNORECASE)
+PAGE_SIZE = 25
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    title_key TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    keyword TEXT,
+    title TEXT,
+    summary TEXT,
+    link TEXT,
+    source TEXT,
+    categories TEXT,
+    title_norm TEXT,
+    summary_norm TEXT,
+    minhash BLOB,
+    cluster_id TEXT,
+    summary_text TEXT,
+    is_primary INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_articles_timestamp ON articles(timestamp);
+CREATE TABLE IF NOT EXISTS lsh_bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    article_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_bands ON lsh_bands(band, bucket);
+CREATE TABLE IF NOT EXISTS article_tags (
+    article_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (article_id, category, keyword)
+);
+CREATE INDEX IF NOT EXISTS idx_article_tags_category ON article_tags(category, article_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, stems, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS archive_fts USING fts5(
+    title, summary, stems, timestamp UNINDEXED, keyword UNINDEXED, title_text UNINDEXED, summary_text UNINDEXED,
+    link UNINDEXED, source UNINDEXED, categories UNINDEXED, cluster_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+CREATE TABLE IF NOT EXISTS keyword_daily (
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    source TEXT NOT NULL,
+    mentions INTEGER NOT NULL,
+    PRIMARY KEY (day, category, keyword, source)
+);
+CREATE INDEX IF NOT EXISTS idx_keyword_daily_category ON keyword_daily(category, day);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS ingest_runs (
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    new_articles INTEGER NOT NULL,
+    failed_feeds INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feed_state (
+    source TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    newest TEXT,
+    newest_at TEXT,
+    scope TEXT,
+    checked_at TEXT,
+    poll_interval_s REAL,
+    learned_interval_s REAL,
+    failures INTEGER,
+    next_poll_at TEXT
+);
+CREATE TABLE IF NOT EXISTS feed_runs (
+    run_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    status INTEGER,
+    latency_ms REAL,
+    bytes INTEGER,
+    entries INTEGER,
+    new_articles INTEGER,
+    newest_age_s REAL,
+    parse_error TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_feed_runs_source ON feed_runs(source, run_at);
+CREATE INDEX IF NOT EXISTS idx_feed_runs_run_at ON feed_runs(run_at);
+"""
+
+def normalize_link(link):
+    parts = urllib.parse.urlsplit(link.strip())
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAMS_RE.match(k)]
+    return urllib.parse.urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), urllib.parse.urlencode(query), ""
+    ))
+
+def normalize_title(title):
+    return " ".join(str(title).split()).casefold()
+
+def article_keys(item):
+    # (id, title_key): the link identifies an article, the title catches re-posts under another URL
+    title_key = hashlib.sha1(normalize_title(item.get("title", "")).encode("utf-8")).hexdigest()
+    link = item.get("link") or ""
+    article_id = hashlib.sha1(normalize_link(link).encode("utf-8")).hexdigest() if link else title_key
+    return article_id, title_key
+
+def open_store(path=None):
+    conn = sqlite3.connect(path or DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(STORE_SCHEMA)
+    ensure_columns(conn, "articles", {
+        "categories": "TEXT", "title_norm": "TEXT", "summary_norm": "TEXT", "minhash": "BLOB", "cluster_id": "TEXT",
+        "summary_text": "TEXT", "is_primary": "INTEGER"
+    })
+    ensure_columns(conn, "feed_state", {
+        "newest_at": "TEXT", "poll_interval_s": "REAL", "learned_interval_s": "REAL", "failures": "INTEGER",
+        "next_poll_at": "TEXT"
+    })
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_cluster ON articles(cluster_id)")
+    # One row per cluster (its newest copy), so the grouped listing pages straight off an index
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_primary ON articles(timestamp) WHERE is_primary = 1")
+    if os.path.exists(CSV_PATH):
+        import_legacy_csv(conn, CSV_PATH)
+    classify_stored_articles(conn)
+    clean_stored_summaries(conn)
+    cluster_stored_articles(conn)
+    mark_cluster_primaries(conn)
+    build_search_index(conn)
+    build_archive_search_index(conn)
+    build_keyword_rollup(conn)
+    return conn
+
+def ensure_columns(conn, table, columns):
+    # Adds columns introduced after a database was first created
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, sql_type in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+
+def write_tags(conn, article_id, tags):
+    conn.execute("UPDATE articles SET categories = ? WHERE id = ?", ("|".join(sorted(tags)), article_id))
+    conn.execute("DELETE FROM article_tags WHERE article_id = ?", (article_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO article_tags (article_id, category, keyword) VALUES (?, ?, ?)",
+        [(article_id, category, keyword) for category, keywords in tags.items() for keyword in keywords]
+    )
+
+def classify_stored_articles(conn):
+    # Fills token columns and tags for rows stored before normalization existed
+    rows = conn.execute("SELECT id, title, summary FROM articles WHERE title_norm IS NULL OR categories IS NULL").fetchall()
+    with conn:
+        for article_id, title, summary in rows:
+            item = prepare_article({"title": title, "summary": summary})
+            conn.execute(
+                "UPDATE articles SET keyword = ?, title_norm = ?, summary_norm = ? WHERE id = ?",
+                (item["keyword"], item["title_norm"], item["summary_norm"], article_id)
+            )
+            write_tags(conn, article_id, item["tags"])
+
+def clean_stored_summaries(conn):
+    # Plain-text summaries for rows stored before ingest-time cleaning existed
+    rows = conn.execute("SELECT id, summary FROM articles WHERE summary_text IS NULL").fetchall()
+    with conn:
+        conn.executemany(
+            "UPDATE articles SET summary_text = ? WHERE id = ?", [(clean_summary(summary), article_id) for article_id, summary in rows]
+        )
+
+def assign_cluster(conn, article_id, timestamp, tokens):
+    # Joins the most similar recent article sharing an LSH bucket, or starts a new cluster;
+    # cost depends on bucket sizes, not on the size of the archive
+    signature = minhash(tokens)
+    cluster_id = article_id
+    packed = None
+    if signature is not None:
+        packed = struct.pack(f"<{MINHASH_PERMUTATIONS}I", *signature)
+        published = datetime.fromisoformat(timestamp)
+        window = (
+            (published - timedelta(days=CLUSTER_WINDOW_DAYS)).isoformat(),
+            (published + timedelta(days=CLUSTER_WINDOW_DAYS)).isoformat()
+        )
+        bands = lsh_bands(signature)
+        candidates = conn.execute(
+            "SELECT a.minhash, a.cluster_id FROM articles a WHERE a.id IN ("
+            + " UNION ".join(["SELECT article_id FROM lsh_bands WHERE band = ? AND bucket = ?"] * len(bands))
+            + ") AND a.id != ? AND a.timestamp BETWEEN ? AND ? LIMIT ?",
+            [x for band in bands for x in band] + [article_id, *window, CLUSTER_MAX_CANDIDATES]
+        ).fetchall()
+        best_similarity = DUPLICATE_THRESHOLD
+        for candidate, candidate_cluster in candidates:
+            similarity = signature_similarity(signature, struct.unpack(f"<{MINHASH_PERMUTATIONS}I", candidate))
+            if similarity >= best_similarity:
+                best_similarity, cluster_id = similarity, candidate_cluster
+        conn.executemany(
+            "INSERT INTO lsh_bands (band, bucket, article_id) VALUES (?, ?, ?)",
+            [(band, bucket, article_id) for band, bucket in bands]
+        )
+    # The newest copy is the cluster's primary row, the one the grouped listing shows
+    primary = conn.execute(
+        "SELECT id, timestamp FROM articles WHERE cluster_id = ? AND is_primary = 1 AND id != ?", (cluster_id, article_id)
+    ).fetchone()
+    is_primary = primary is None or timestamp >= primary[1]
+    if primary is not None and is_primary:
+        conn.execute("UPDATE articles SET is_primary = 0 WHERE id = ?", (primary[0],))
+    conn.execute(
+        "UPDATE articles SET minhash = ?, cluster_id = ?, is_primary = ? WHERE id = ?",
+        (packed, cluster_id, int(is_primary), article_id)
+    )
+    return cluster_id
+
+def cluster_stored_articles(conn):
+    rows = conn.execute(
+        "SELECT id, timestamp, title_norm, summary_norm FROM articles WHERE cluster_id IS NULL ORDER BY timestamp"
+    ).fetchall()
+    with conn:
+        for article_id, timestamp, title_norm, summary_norm in rows:
+            assign_cluster(conn, article_id, timestamp, f"{title_norm or ''} {summary_norm or ''}".split())
+
+def mark_cluster_primaries(conn):
+    # One-time backfill of is_primary for databases clustered before it existed; assign_cluster maintains it
+    if conn.execute("SELECT 1 FROM store_meta WHERE key = 'primary_built'").fetchone():
+        return
+    with conn:
+        conn.execute(
+            "UPDATE articles SET is_primary = (id = (SELECT b.id FROM articles b WHERE b.cluster_id = articles.cluster_id "
+            "ORDER BY b.timestamp DESC, b.id LIMIT 1)) WHERE cluster_id IS NOT NULL"
+        )
+        conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('primary_built', '1')")
+
+def stems_text(title_norm, summary_norm):
+    return " ".join(stem(t) for t in f"{title_norm or ''} {summary_norm or ''}".split())
+
+def index_article(conn, rowid, title_norm, summary_norm):
+    # FTS rows share the article's rowid; text is already normalized, so Arabic and English index alike
+    conn.execute(
+        "INSERT INTO articles_fts (rowid, title, summary, stems) VALUES (?, ?, ?, ?)",
+        (rowid, title_norm, summary_norm, stems_text(title_norm, summary_norm))
+    )
+
+def index_archived(conn, archived):
+    # Archived articles keep a full-text row with their display columns, so search still reaches them once
+    # their SQLite rows are gone; `archived` has ARCHIVE_COLUMNS plus title_norm/summary_norm
+    conn.executemany(
+        "INSERT INTO archive_fts (title, summary, stems, timestamp, keyword, title_text, summary_text, link, source, "
+        "categories, cluster_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (row.title_norm, row.summary_norm, stems_text(row.title_norm, row.summary_norm), row.timestamp, row.keyword,
+             row.title, row.summary, row.link, row.source, row.categories, row.cluster_id)
+            for row in archived.astype(object).where(archived.notna(), None).itertuples(index=False)
+        ]
+    )
+
+def build_search_index(conn):
+    # Backfill for databases created before the full-text index, or indexed with older stemming rules;
+    # afterwards it is maintained on insert
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'fts_built'").fetchone()
+    if row is not None and row[0] == STEMS_VERSION:
+        return
+    with conn:
+        conn.execute("DELETE FROM articles_fts")
+        for rowid, title_norm, summary_norm in conn.execute("SELECT rowid, title_norm, summary_norm FROM articles").fetchall():
+            index_article(conn, rowid, title_norm, summary_norm)
+        conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('fts_built', ?)", (STEMS_VERSION,))
+
+def build_archive_search_index(conn):
+    # Indexes month partitions archived before archive_fts existed (or with older stemming rules), once;
+    # afterwards archive_old_articles adds rows as it archives them
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'archive_fts_built'").fetchone()
+    if row is not None and row[0] == STEMS_VERSION:
+        return
+    with conn:
+        conn.execute("DELETE FROM archive_fts")
+        for archived in iter_archive():
+            index_archived(conn, archived.assign(
+                title_norm=[" ".join(tokenize(title)) for title in archived["title"]],
+                summary_norm=[" ".join(tokenize(summary)) for summary in archived["summary"]],
+            ))
+        conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('archive_fts_built', ?)", (STEMS_VERSION,))
+
+CATEGORY_TOTAL = "*"  # keyword_daily row counting articles per category, not keyword hits
+ROLLUP_VERSION = "2"  # 2 added the CATEGORY_TOTAL rows
+ROLLUP_UPSERT = (
+    "INSERT INTO keyword_daily (day, category, keyword, source, mentions) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (day, category, keyword, source) DO UPDATE SET mentions = mentions + excluded.mentions"
+)
+
+def count_mentions(conn, day, source, tags):
+    # Rollup upsert: one mention per article for every (category, keyword) it matched, plus one
+    # CATEGORY_TOTAL mention per category, so an article hitting three Products keywords counts once there
+    conn.executemany(ROLLUP_UPSERT, [
+        (day, category, keyword, source or "", 1)
+        for category, keywords in tags.items() for keyword in [*keywords, CATEGORY_TOTAL]
+    ])
+
+def build_keyword_rollup(conn):
+    # One-time backfill from article_tags; afterwards insert_articles keeps it current and it outlives archiving.
+    # Rollups built before CATEGORY_TOTAL keep their keyword rows and get category totals from the live
+    # articles and the Parquet archive.
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'rollup_built'").fetchone()
+    if row is not None and row[0] == ROLLUP_VERSION:
+        return
+    with conn:
+        if row is None:
+            conn.execute("DELETE FROM keyword_daily")
+            conn.execute(
+                "INSERT INTO keyword_daily (day, category, keyword, source, mentions) "
+                "SELECT substr(a.timestamp, 1, 10), t.category, t.keyword, COALESCE(a.source, ''), COUNT(*) "
+                "FROM article_tags t JOIN articles a ON a.id = t.article_id GROUP BY 1, 2, 3, 4"
+            )
+        else:
+            conn.execute("DELETE FROM keyword_daily WHERE keyword = ?", (CATEGORY_TOTAL,))
+            for archived in iter_archive():
+                days = archived["timestamp"].str[:10]
+                sources = archived["source"].fillna("")
+                counts = pd.DataFrame({"day": days, "source": sources, "category": archived["categories"].fillna("").str.split("|")})
+                counts = counts.explode("category").query("category != ''").value_counts(["day", "category", "source"])
+                conn.executemany(ROLLUP_UPSERT, [
+                    (day, category, CATEGORY_TOTAL, source, int(mentions)) for (day, category, source), mentions in counts.items()
+                ])
+        conn.execute(
+            "INSERT INTO keyword_daily (day, category, keyword, source, mentions) "
+            "SELECT substr(a.timestamp, 1, 10), t.category, ?, COALESCE(a.source, ''), COUNT(DISTINCT t.article_id) "
+            "FROM article_tags t JOIN articles a ON a.id = t.article_id GROUP BY 1, 2, 4 "
+            "ON CONFLICT (day, category, keyword, source) DO UPDATE SET mentions = mentions + excluded.mentions",
+            (CATEGORY_TOTAL,)
+        )
+        conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('rollup_built', ?)", (ROLLUP_VERSION,))
+
+def import_legacy_csv(conn, csv_path):
+    # The CSV is left in place; its size/mtime signature stops it from being re-read on every open
+    stat = os.stat(csv_path)
+    signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'legacy_csv'").fetchone()
+    if row is not None and row[0] == signature:
+        return
+    legacy = pd.read_csv(csv_path)
+    if not legacy.empty:
+        legacy["timestamp"] = pd.to_datetime(legacy["timestamp"], utc=True, errors="coerce")
+        legacy["timestamp"] = legacy["timestamp"].fillna(pd.Timestamp.now(tz="UTC"))
+        insert_articles(conn, legacy.where(pd.notnull(legacy), None).to_dict("records"))
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('legacy_csv', ?)", (signature,))
+
+def insert_articles(conn, items):
+    # Idempotent upsert; returns only the rows that were actually new
+    inserted = []
+    with conn:
+        for item in items:
+            article_id, title_key = article_keys(item)
+            timestamp = item["timestamp"]
+            timestamp = timestamp.isoformat() if hasattr(timestamp, "isoformat") else str(timestamp)
+            if "summary_text" not in item:
+                prepare_article(item)
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO articles "
+                "(id, title_key, timestamp, keyword, title, summary, summary_text, link, source, title_norm, summary_norm) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (article_id, title_key, timestamp, item.get("keyword"), item.get("title"), item.get("summary"),
+                 item["summary_text"], item.get("link"), item.get("source"), item["title_norm"], item["summary_norm"])
+            )
+            if cur.rowcount:
+                index_article(conn, cur.lastrowid, item["title_norm"], item["summary_norm"])
+                write_tags(conn, article_id, item["tags"])
+                count_mentions(conn, timestamp[:10], item.get("source"), item["tags"])
+                tokens = f"{item['title_norm']} {item['summary_norm']}".split()
+                item["cluster_id"] = assign_cluster(conn, article_id, timestamp, tokens)
+                inserted.append(item)
+    return inserted
+
+def article_filters(category=None, since=None, until=None, alias="articles"):
+    # WHERE clause and params shared by listing, counting and search; every filter is backed by an index
+    clauses, params = [], []
+    if category is not None:
+        clauses.append(f"{alias}.id IN (SELECT article_id FROM article_tags WHERE category = ?)")
+        params.append(category)
+    if since is not None:
+        clauses.append(f"{alias}.timestamp >= ?")
+        params.append(since.isoformat())
+    if until is not None:
+        clauses.append(f"{alias}.timestamp < ?")
+        params.append(until.isoformat())
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def days_back_since(days_back):
+    return None if days_back is None else datetime.now(timezone.utc) - timedelta(days=days_back)
+
+def articles_query(category=None, days_back=None, collapse_duplicates=False):
+    # (sql, params) behind load_articles, newest first; with collapse_duplicates each near-duplicate
+    # cluster becomes its primary (newest) copy plus `sources`/`copies`. Only primary rows are walked, on
+    # idx_articles_primary, and the per-cluster subqueries run just for the rows of the requested page.
+    since = days_back_since(days_back)
+    query = "SELECT timestamp, keyword, title, summary_text AS summary, link, source, categories, cluster_id"
+    where, params = article_filters(category, since)
+    if not collapse_duplicates:
+        return query + " FROM articles" + where + " ORDER BY timestamp DESC", params
+    copy_where, copy_params = article_filters(category, since, alias="c")
+    copies = "FROM articles c" + (copy_where + " AND" if copy_where else " WHERE") + " c.cluster_id = articles.cluster_id"
+    query += (
+        f", (SELECT group_concat(DISTINCT c.source) {copies}) AS sources, (SELECT COUNT(*) {copies}) AS copies FROM articles"
+        + (where + " AND" if where else " WHERE") + " is_primary = 1"
+    )
+    return query + " ORDER BY timestamp DESC", copy_params + copy_params + params
+
+def load_articles(conn, category=None, days_back=None, collapse_duplicates=False, limit=None, offset=0):
+    # Straight off the timestamp index; pass limit/offset to fetch one page
+    query, params = articles_query(category, days_back, collapse_duplicates)
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    return pd.read_sql_query(query, conn, params=params)
+
+def count_articles(conn, category=None, days_back=None, collapse_duplicates=False):
+    where, params = article_filters(category, days_back_since(days_back))
+    if collapse_duplicates:
+        where += (" AND" if where else " WHERE") + " is_primary = 1"
+    return conn.execute(f"SELECT COUNT(*) FROM articles{where}", params).fetchone()[0]
+
+def build_search_query(text):
+    # User text -> FTS5 expression: every term must match, as a token or via its stem; "term*" is a prefix search
+    clauses = []
+    for part in text.split():
+        prefix = part.endswith("*")
+        tokens = tokenize(part)
+        for i, token in enumerate(tokens):
+            if prefix and i == len(tokens) - 1:
+                clauses.append(f'"{token}"*')
+            else:
+                clauses.append(f'("{token}" OR stems : "{stem(token)}")')
+    return " AND ".join(clauses)
+
+def archive_search_filters(category=None, since=None, until=None):
+    # Same filters as article_filters, on archive_fts' unindexed columns; applied to the MATCH hits only
+    clauses, params = [], []
+    if category is not None:
+        clauses.append("instr('|' || categories || '|', ?) > 0")
+        params.append(f"|{category}|")
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(since.isoformat())
+    if until is not None:
+        clauses.append("timestamp < ?")
+        params.append(until.isoformat())
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+def search_query(text, category=None, since=None, until=None):
+    # (sql, params) for ranked (bm25, title weighted) full-text search over the live store and the archive,
+    # or None when the text has no terms
+    match = build_search_query(text)
+    if not match:
+        return None
+    where, params = article_filters(category, since, until, alias="a")
+    archive_where, archive_params = archive_search_filters(category, since, until)
+    query = (
+        "SELECT a.timestamp, a.keyword, a.title, a.summary_text AS summary, a.link, a.source, a.categories, a.cluster_id, "
+        "bm25(articles_fts, 2.0, 1.0, 0.5) AS rank "
+        "FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid"
+        + (where + " AND" if where else " WHERE") + " articles_fts MATCH ?"
+        " UNION ALL "
+        "SELECT timestamp, keyword, title_text, summary_text, link, source, categories, cluster_id, "
+        "bm25(archive_fts, 2.0, 1.0, 0.5) FROM archive_fts WHERE archive_fts MATCH ?" + archive_where
+        + " ORDER BY rank"
+    )
+    return query, params + [match, match] + archive_params
+
+def search_articles(conn, text, category=None, since=None, until=None, limit=PAGE_SIZE, offset=0):
+    # Full-text search with optional category and date-range filters, best match first
+    searched = search_query(text, category, since, until)
+    if searched is None:
+        return load_articles(conn, category, limit=0)
+    query, params = searched
+    return pd.read_sql_query(query + " LIMIT ? OFFSET ?", conn, params=params + [limit, offset])
+
+def count_search(conn, text, category=None, since=None, until=None):
+    match = build_search_query(text)
+    if not match:
+        return 0
+    where, params = article_filters(category, since, until, alias="a")
+    archive_where, archive_params = archive_search_filters(category, since, until)
+    query = (
+        "SELECT (SELECT COUNT(*) FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid"
+        + (where + " AND" if where else " WHERE") + " articles_fts MATCH ?), "
+        "(SELECT COUNT(*) FROM archive_fts WHERE archive_fts MATCH ?" + archive_where + ")"
+    )
+    live, archived = conn.execute(query, params + [match, match] + archive_params).fetchone()
+    return live + archived
+
+def clear_store(conn):
+    with conn:
+        conn.execute("DELETE FROM articles")
+        conn.execute("DELETE FROM article_tags")
+        conn.execute("DELETE FROM lsh_bands")
+        conn.execute("DELETE FROM articles_fts")
+        conn.execute("DELETE FROM archive_fts")
+        conn.execute("DELETE FROM feed_state")
+        conn.execute("DELETE FROM ingest_runs")
+        conn.execute("DELETE FROM feed_runs")
+        conn.execute("DELETE FROM keyword_daily")
+    shutil.rmtree(archive_dir(), ignore_errors=True)
+
+# --- Keyword Trends (daily rollup) ---
+SPIKE_WINDOW_DAYS = 14
+SPIKE_Z_SCORE = 3.0
+SPIKE_MIN_MENTIONS = 3
+
+def keyword_trends(conn, category=None, days=90, source=None):
+    # Daily mentions per keyword, or articles per category when none is given, zero-filled; reads only the rollup table
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+    series = "keyword" if category is not None else "category"
+    query = f"SELECT day, {series} AS series, SUM(mentions) AS mentions FROM keyword_daily WHERE day >= ?"
+    params = [since]
+    if category is not None:
+        query += " AND category = ? AND keyword != ?"
+        params += [category, CATEGORY_TOTAL]
+    else:
+        query += " AND keyword = ?"
+        params.append(CATEGORY_TOTAL)
+    if source is not None:
+        query += " AND source = ?"
+        params.append(source)
+    rollup = pd.read_sql_query(query + " GROUP BY day, series", conn, params=params)
+    days_index = pd.date_range(since, datetime.now(timezone.utc).date(), freq="D")
+    if rollup.empty:
+        return pd.DataFrame(index=days_index)
+    rollup["day"] = pd.to_datetime(rollup["day"])
+    return rollup.pivot(index="day", columns="series", values="mentions").reindex(days_index, fill_value=0).fillna(0)
+
+def detect_spikes(trends, window=SPIKE_WINDOW_DAYS, z_score=SPIKE_Z_SCORE, min_mentions=SPIKE_MIN_MENTIONS):
+    # Days where a series jumps z_score standard deviations above its trailing window (today excluded from it)
+    baseline = trends.shift(1).rolling(window, min_periods=window // 2)
+    mean, std = baseline.mean(), baseline.std().clip(lower=1.0)
+    scores = (trends - mean) / std
+    spikes = scores.where((scores >= z_score) & (trends >= min_mentions)).stack().dropna().rename("z_score").reset_index()
+    spikes.columns = ["day", "series", "z_score"]
+    spikes["mentions"] = [trends.at[day, series] for day, series in zip(spikes["day"], spikes["series"])]
+    spikes["baseline"] = [round(mean.at[day, series], 1) for day, series in zip(spikes["day"], spikes["series"])]
+    return spikes.sort_values("day", ascending=False).reset_index(drop=True)
+
+FEED_STATE_FIELDS = [
+    "etag", "last_modified", "newest", "newest_at", "scope", "checked_at",
+    "poll_interval_s", "learned_interval_s", "failures", "next_poll_at"
+]
+
+def load_feed_state(conn):
+    rows = conn.execute(f"SELECT source, {', '.join(FEED_STATE_FIELDS)} FROM feed_state")
+    return {row[0]: dict(zip(FEED_STATE_FIELDS, row[1:])) for row in rows}
+
+def save_feed_state(conn, state):
+    columns = ["source"] + FEED_STATE_FIELDS
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO feed_state ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [(source, *(s.get(field) for field in FEED_STATE_FIELDS)) for source, s in state.items()]
+        )
+
+# --- Feed Telemetry ---
+FEED_RUNS_RETENTION_DAYS = 30
+FEED_RUN_FIELDS = ["status", "latency_ms", "bytes", "entries", "new_articles", "newest_age_s", "parse_error", "error"]
+
+def record_feed_runs(conn, run_at, runs):
+    # runs: list of (source, stats) with any of FEED_RUN_FIELDS; old history is pruned as we go
+    columns = ["run_at", "source"] + FEED_RUN_FIELDS
+    with conn:
+        conn.executemany(
+            f"INSERT INTO feed_runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [(run_at.isoformat(), source, *(stats.get(field) for field in FEED_RUN_FIELDS)) for source, stats in runs]
+        )
+        conn.execute(
+            "DELETE FROM feed_runs WHERE run_at < ?",
+            ((run_at - timedelta(days=FEED_RUNS_RETENTION_DAYS)).isoformat(),)
+        )
+
+def feed_status(conn, days=7):
+    # One row per feed: latest outcome plus error rate and latency over the window, slowest/broken first
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    return pd.read_sql_query(
+        """
+        SELECT r.source, r.run_at AS last_run, r.status, r.error, r.parse_error, r.latency_ms, r.bytes, r.entries,
+               r.newest_age_s / 3600.0 AS newest_age_h, w.runs, w.error_rate, w.avg_latency_ms, w.max_latency_ms,
+               w.new_articles
+        FROM feed_runs r
+        JOIN (
+            SELECT source, MAX(run_at) AS last_run, COUNT(*) AS runs, AVG(error IS NOT NULL) AS error_rate,
+                   AVG(latency_ms) AS avg_latency_ms, MAX(latency_ms) AS max_latency_ms,
+                   SUM(new_articles) AS new_articles
+            FROM feed_runs WHERE run_at >= ? GROUP BY source
+        ) w ON w.source = r.source AND w.last_run = r.run_at
+        ORDER BY w.error_rate DESC, w.avg_latency_ms DESC
+        """,
+        conn, params=[since]
+    )
+
+def feed_history(conn, source=None, days=7):
+    query = "SELECT run_at, source, status, latency_ms, bytes, entries, new_articles, error FROM feed_runs WHERE run_at >= ?"
+    params = [(datetime.now(timezone.utc) - timedelta(days=days)).isoformat()]
+    if source is not None:
+        query += " AND source = ?"
+        params.append(source)
+    return pd.read_sql_query(query + " ORDER BY run_at", conn, params=params)
+
+# --- Cold Archive (month-partitioned Parquet, retention, compaction) ---
+ARCHIVE_RETENTION_MONTHS = 36
+ARCHIVE_MAINTENANCE_INTERVAL = 24 * 3600  # the ingest daemons archive/compact/prune at most once a day
+ARCHIVE_COLUMNS = ["timestamp", "keyword", "title", "summary", "link", "source", "categories", "cluster_id"]
+
+def archive_dir():
+    # Next to the database unless NEWS_TRACKER_ARCHIVE says otherwise; one month=YYYY-MM folder per partition
+    return os.environ.get("NEWS_TRACKER_ARCHIVE") or os.path.splitext(DB_PATH)[0] + "_archive"
+
+def archive_months(since=None, until=None):
+    # Partitions overlapping [since, until), oldest first
+    root = archive_dir()
+    if not os.path.isdir(root):
+        return []
+    months = sorted(name[len("month="):] for name in os.listdir(root) if name.startswith("month="))
+    low = since.strftime("%Y-%m") if since is not None else None
+    high = until.strftime("%Y-%m") if until is not None else None
+    return [m for m in months if (low is None or m >= low) and (high is None or m <= high)]
+
+def archive_parts(month):
+    folder = os.path.join(archive_dir(), f"month={month}")
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder)) if name.endswith(".parquet")]
+
+def part_name():
+    return f"part-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}.parquet"
+
+def archive_old_articles(conn, older_than_days=INGEST_DAYS):
+    # Moves rows the feeds can no longer re-deliver out of SQLite, one new part file per month touched.
+    # Parts are written before the rows are deleted, so a crash leaves duplicates for compaction, never gaps.
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+    columns = ", ".join("summary_text AS summary" if column == "summary" else column for column in ARCHIVE_COLUMNS)
+    old = pd.read_sql_query(
+        f"SELECT rowid, id, {columns}, title_norm, summary_norm FROM articles WHERE timestamp < ? ORDER BY timestamp DESC",
+        conn, params=[cutoff]
+    )
+    if old.empty:
+        return 0
+    for month, part in old.groupby(old["timestamp"].str[:7]):
+        folder = os.path.join(archive_dir(), f"month={month}")
+        os.makedirs(folder, exist_ok=True)
+        part[ARCHIVE_COLUMNS].to_parquet(os.path.join(folder, part_name()), index=False)
+    ids = [(article_id,) for article_id in old["id"]]
+    with conn:
+        # The search row moves to archive_fts in the same transaction, so archived articles stay searchable
+        index_archived(conn, old[ARCHIVE_COLUMNS + ["title_norm", "summary_norm"]])
+        conn.executemany("DELETE FROM articles_fts WHERE rowid = ?", [(int(rowid),) for rowid in old["rowid"]])
+        conn.executemany("DELETE FROM article_tags WHERE article_id = ?", ids)
+        conn.executemany("DELETE FROM lsh_bands WHERE article_id = ?", ids)
+        conn.executemany("DELETE FROM articles WHERE id = ?", ids)
+    return len(old)
+
+def compact_archive():
+    # Rewrites every month with more than one part file as a single file, newest first and de-duplicated
+    compacted = 0
+    for month in archive_months():
+        parts = archive_parts(month)
+        if len(parts) < 2:
+            continue
+        merged = pd.concat([pd.read_parquet(path) for path in parts], ignore_index=True)
+        merged = merged.drop_duplicates(["link", "title"]).sort_values("timestamp", ascending=False)
+        target = os.path.join(os.path.dirname(parts[0]), part_name())
+        merged.to_parquet(target + ".tmp", index=False)
+        os.replace(target + ".tmp", target)
+        for path in parts:
+            os.remove(path)
+        compacted += 1
+    return compacted
+
+def prune_archive(retention_months=ARCHIVE_RETENTION_MONTHS, conn=None):
+    # Drops whole month partitions that fall outside the retention window, and their search rows when given the store
+    now = datetime.now(timezone.utc)
+    months_since_epoch = now.year * 12 + now.month - 1 - retention_months
+    oldest_kept = f"{months_since_epoch // 12:04d}-{months_since_epoch % 12 + 1:02d}"
+    expired = [month for month in archive_months() if month < oldest_kept]
+    for month in expired:
+        shutil.rmtree(os.path.join(archive_dir(), f"month={month}"), ignore_errors=True)
+    if conn is not None:
+        with conn:
+            conn.execute("DELETE FROM archive_fts WHERE substr(timestamp, 1, 7) < ?", (oldest_kept,))
+    return len(expired)
+
+def maintain_archive(store=None, retention_months=ARCHIVE_RETENTION_MONTHS, force=False):
+    # Archive + compact + prune, skipped if it already ran within ARCHIVE_MAINTENANCE_INTERVAL
+    own_store = store is None
+    store = open_store() if own_store else store
+    try:
+        now = datetime.now(timezone.utc)
+        row = store.execute("SELECT value FROM store_meta WHERE key = 'archive_maintained_at'").fetchone()
+        if not force and row is not None and (now - datetime.fromisoformat(row[0])).total_seconds() < ARCHIVE_MAINTENANCE_INTERVAL:
+            return None
+        archived = archive_old_articles(store)
+        compacted = compact_archive()
+        pruned = prune_archive(retention_months, store)
+        with store:
+            store.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('archive_maintained_at', ?)", (now.isoformat(),)
+            )
+        log.info("Archive: moved %d articles, compacted %d months, dropped %d expired months",
+                 archived, compacted, pruned)
+        return archived, compacted, pruned
+    finally:
+        if own_store:
+            store.close()
+
+def iter_archive(category=None, since=None, until=None):
+    # Archived articles in [since, until), one month at a time, newest month first;
+    # only the month partitions in range are opened
+    for month in reversed(archive_months(since, until)):
+        archived = pd.concat([pd.read_parquet(path) for path in archive_parts(month)], ignore_index=True)
+        archived = archived.drop_duplicates(["link", "title"])
+        if since is not None:
+            archived = archived[archived["timestamp"] >= since.isoformat()]
+        if until is not None:
+            archived = archived[archived["timestamp"] < until.isoformat()]
+        if category is not None:
+            archived = archived[("|" + archived["categories"].fillna("") + "|").str.contains(f"|{category}|", regex=False)]
+        yield archived.sort_values("timestamp", ascending=False)
+
+def load_archived(conn, category=None, since=None, until=None, limit=PAGE_SIZE, offset=0):
+    # One page of archived articles, newest first, read from archive_fts rather than the Parquet files
+    where, params = archive_search_filters(category, since, until)
+    return pd.read_sql_query(
+        "SELECT timestamp, keyword, title_text AS title, summary_text AS summary, link, source, categories, cluster_id "
+        "FROM archive_fts WHERE 1" + where + " ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+        conn, params=params + [limit, offset]
+    )
+
+def count_archived(conn, category=None, since=None, until=None):
+    where, params = archive_search_filters(category, since, until)
+    return conn.execute("SELECT COUNT(*) FROM archive_fts WHERE 1" + where, params).fetchone()[0]
+
+# --- Export (streamed in chunks) ---
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_COLUMNS = ARCHIVE_COLUMNS
+EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+def iter_export_chunks(conn, category=None, days_back=None, search_text=None, chunk_size=EXPORT_CHUNK_ROWS):
+    # DataFrames of at most chunk_size rows (one month at a time from the archive) matching the UI filters;
+    # a search covers archived articles through archive_fts, otherwise the archive is only read when the window
+    # reaches past the live store
+    since = days_back_since(days_back)
+    if search_text and search_text.strip():
+        searched = search_query(search_text, category, since=since)
+        if searched is not None:
+            yield from pd.read_sql_query(searched[0], conn, params=searched[1], chunksize=chunk_size)
+        return
+    query, params = articles_query(category, days_back)
+    yield from pd.read_sql_query(query, conn, params=params, chunksize=chunk_size)
+    if days_back is None or days_back > INGEST_DAYS:
+        yield from iter_archive(category, since=since)
+
+def export_articles(conn, out, fmt="csv", category=None, days_back=None, search_text=None):
+    # Streams the filtered articles into a binary file object as CSV, JSON Lines or Parquet; returns the row count.
+    # Memory use is bounded by one chunk whatever the size of the store.
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    rows, writer, header = 0, None, True
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+        writer = pq.ParquetWriter(out, schema)
+    try:
+        for chunk in iter_export_chunks(conn, category, days_back, search_text):
+            chunk = chunk.reindex(columns=EXPORT_COLUMNS)
+            if fmt == "csv":
+                out.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+                header = False
+            elif fmt == "jsonl":
+                if len(chunk):
+                    out.write(chunk.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n").encode("utf-8") + b"\n")
+            else:
+                writer.write_table(pa.Table.from_pandas(chunk.astype(object).where(chunk.notna(), None), schema=schema, preserve_index=False))
+            rows += len(chunk)
+        if fmt == "csv" and header:
+            out.write((",".join(EXPORT_COLUMNS) + "\n").encode("utf-8"))
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+# --- Ingest (shared by the CLI daemon and the UI's manual refresh) ---
+log = logging.getLogger("news_tracker")
+
+INTERVAL_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$", re.IGNORECASE)
+INTERVAL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_interval(text):
+    # "90", "45s", "10m", "1.5h" -> seconds
+    match = INTERVAL_RE.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid interval: {text!r} (use e.g. 30s, 10m, 1h)")
+    return float(match.group(1)) * INTERVAL_UNITS[match.group(2).lower()]
+
+def ingest_once(store=None, on_feed=None, feeds=None, deadline=FETCH_DEADLINE):
+    # One scan of every feed (or the given subset) into the store within `deadline` seconds;
+    # on_feed(done, source, new_count, error) reports progress
+    own_store = store is None
+    store = open_store() if own_store else store
+    started_at = datetime.now(timezone.utc)
+    new_count = 0
+    failed_feeds = []
+    runs = []
+    try:
+        for done, (source, items, error, stats, feed_state) in enumerate(iter_rss_news(deadline=deadline, store=store, feeds=feeds), start=1):
+            if error is not None:
+                failed_feeds.append((source, error))
+                stats["error"] = repr(error)
+            stats["new_articles"] = len(insert_articles(store, items))
+            save_feed_state(store, {source: feed_state})  # only now may the next run trust this feed's validators
+            new_count += stats["new_articles"]
+            runs.append((source, stats))
+            if on_feed is not None:
+                on_feed(done, source, new_count, error)
+        record_feed_runs(store, started_at, runs)
+        with store:
+            store.execute(
+                "INSERT INTO ingest_runs (started_at, finished_at, new_articles, failed_feeds) VALUES (?, ?, ?, ?)",
+                (started_at.isoformat(), datetime.now(timezone.utc).isoformat(), new_count, len(failed_feeds))
+            )
+    finally:
+        if own_store:
+            store.close()
+    return new_count, failed_feeds
+
+def last_ingest(conn):
+    # (finished_at, new_articles, failed_feeds) of the latest run, or None
+    row = conn.execute(
+        "SELECT finished_at, new_articles, failed_feeds FROM ingest_runs ORDER BY finished_at DESC LIMIT 1"
+    ).fetchone()
+    if row is None:
+        return None
+    return datetime.fromisoformat(row[0]), row[1], row[2]
+
+def run_ingest(interval, once=False):
+    while True:
+        started = time.monotonic()
+        try:
+            new_count, failed_feeds = ingest_once()
+            log.info("Ingested %d new articles from %d feeds (%d failed) in %.1fs",
+                     new_count, len(RSS_FEEDS), len(failed_feeds), time.monotonic() - started)
+            for source, error in failed_feeds:
+                log.warning("Feed %s failed: %s", source, error)
+            maintain_archive()
+        except Exception:
+            log.exception("Ingest run failed")
+        if once:
+            return
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+def run_adaptive_ingest(tick, budget_per_hour, once=False):
+    # Wakes every `tick` and polls only the feeds that are due, within the hourly request budget
+    while True:
+        started = time.monotonic()
+        try:
+            store = open_store()
+            try:
+                due = due_feeds(store, budget_per_hour)
+                if due:
+                    new_count, failed_feeds = ingest_once(store, feeds={source: RSS_FEEDS[source] for source in due})
+                    log.info("Polled %d due feeds: %d new articles, %d failed in %.1fs",
+                             len(due), new_count, len(failed_feeds), time.monotonic() - started)
+                    for source, error in failed_feeds:
+                        log.warning("Feed %s failed: %s", source, error)
+                maintain_archive(store)
+            finally:
+                store.close()
+        except Exception:
+            log.exception("Adaptive ingest tick failed")
+        if once:
+            return
+        time.sleep(max(0.0, tick - (time.monotonic() - started)))
+
+def run_export(args):
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower() or "csv"
+    store = open_store()
+    try:
+        if args.output == "-":
+            rows = export_articles(store, sys.stdout.buffer, fmt, args.category, args.days, args.search)
+        else:
+            with open(args.output, "wb") as out:
+                rows = export_articles(store, out, fmt, args.category, args.days, args.search)
+    finally:
+        store.close()
+    log.info("Exported %d articles to %s", rows, args.output)
+
+def main(argv=None):
+    global DB_PATH
+    parser = argparse.ArgumentParser(prog="news_tracker", description="Paint Industry News Tracker (headless)")
+    parser.add_argument("--db", help="Path of the shared article database (default: %(default)s)", default=DB_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Poll every RSS feed on a schedule and store new articles")
+    ingest.add_argument("--interval", default=DEFAULT_INTERVAL, type=parse_interval,
+                        help="Time between scans, e.g. 30s, 10m, 1h (default: %(default)s)")
+    ingest.add_argument("--once", action="store_true", help="Run a single scan and exit")
+    ingest.add_argument("--adaptive", action="store_true",
+                        help="Poll each feed on its own learned interval instead of scanning all of them every --interval")
+    ingest.add_argument("--tick", default=DEFAULT_TICK, type=parse_interval,
+                        help="With --adaptive: how often to check for due feeds (default: %(default)s)")
+    ingest.add_argument("--budget", default=REQUEST_BUDGET_PER_HOUR, type=int,
+                        help="With --adaptive: maximum feed requests per hour (default: %(default)s)")
+    export = commands.add_parser("export", help="Stream the stored articles to a CSV, JSONL or Parquet file")
+    export.add_argument("output", help="File to write; '-' writes to stdout")
+    export.add_argument("--format", choices=list(EXPORT_FORMATS), help="Default: taken from the output file extension")
+    export.add_argument("--category", choices=list(CATEGORIES), help="Only articles tagged with this category")
+    export.add_argument("--days", type=int, help="Only articles from the last N days (default: everything)")
+    export.add_argument("--search", help="Only articles matching this full-text search")
+    archive = commands.add_parser("archive", help="Move old articles to the monthly archive, compact it and apply retention")
+    archive.add_argument("--retention-months", default=ARCHIVE_RETENTION_MONTHS, type=int,
+                         help="Drop archive months older than this (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    DB_PATH = args.db
+    try:
+        if args.command == "ingest" and args.adaptive:
+            run_adaptive_ingest(args.tick, args.budget, once=args.once)
+        elif args.command == "ingest":
+            run_ingest(args.interval, once=args.once)
+        elif args.command == "archive":
+            maintain_archive(retention_months=args.retention_months, force=True)
+        elif args.command == "export":
+            run_export(args)
+    except KeyboardInterrupt:
+        log.info("Stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Offline replay server and ingest benchmarks for the news tracker; no live news site is contacted.
+
+    python news_tracker_bench.py serve --latency-ms 150 --error-rate 0.05       # stand-in feeds for manual runs
+    python news_tracker_bench.py run --scale 1 10 100 --save bench.json         # measure
+    python news_tracker_bench.py run --scale 1 10 --baseline bench.json         # fail on regressions
+
+Payloads come from feed_fixtures/: one file per feed shape our RSS_FEEDS return (WordPress RSS, Arabic
+CMS section feeds, large general-news feeds, dc:date, Atom, non-standard dates, oldest-first). Entry dates
+are rebased to the server's start so they always fall inside the scan window.
+"""
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import urllib.parse
+import email.utils
+import threading
+import tracemalloc
+import tempfile
+import argparse
+import hashlib
+import random
+import json
+import gzip
+import time
+import sys
+import re
+import os
+
+import feedparser
+
+import news_tracker as nt
+
+# --- Config ---
+FIXTURE_DIR = os.path.join(nt.BASE_DIR, "feed_fixtures")
+ENTRY_SPACING = timedelta(minutes=40)  # gap between consecutive replayed entries
+GENERAL_NEWS_REPEAT = 20  # general-news fixture x20 = ~200 entries, like the big portals
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_TOLERANCE = 0.25  # allowed slowdown against a baseline before `run` fails
+CLASSIFY_MIN_SECONDS = 1.0
+
+# First matching URL pattern picks the fixture (and how many times it is repeated) for a feed
+FEED_SHAPES = [
+    (re.compile(r"/feed/?$"), "wordpress.xml", 1),
+    (re.compile(r"gate\.ahram\.org\.eg/rss/$|almasryalyoum|SectionID=65$|elbalad\.news/rss\.aspx$|"
+                r"elwatannews\.com/rss/$|masralarabia|masress"), "arabic_general.xml", GENERAL_NEWS_REPEAT),
+    (re.compile(r"mubasher\.info"), "rss_dc_date.xml", 1),
+    (re.compile(r"constructionweekonline"), "atom.xml", 1),
+    (re.compile(r"akhbarelyom|cairo24"), "nonstandard_dates.xml", 1),
+    (re.compile(r""), "arabic_section.xml", 1),
+]
+LINK_RE = re.compile(rb"(<link>\s*(?:<!\[CDATA\[)?\s*)([^<\]\s]+)|(<link[^>]*href=\")([^\"]+)")
+TITLE_RE = re.compile(rb"(<title[^>]*>\s*(?:<!\[CDATA\[)?)")
+
+def fixture_for(url):
+    for pattern, fixture, repeat in FEED_SHAPES:
+        if pattern.search(url):
+            return fixture, repeat
+
+# --- Replay Server ---
+def format_date(tag, original, when):
+    # Same notation and UTC offset as the recorded date
+    when = when.astimezone(original.tzinfo)
+    return email.utils.format_datetime(when).encode() if tag == b"pubDate" else when.isoformat().encode()
+
+def render_fixture(raw, copy, repeat, anchor):
+    # The fixture's entries repeated `repeat` times, newest at `anchor`, with links/titles unique per copy
+    blocks = list(nt.NEWEST_ENTRY_RE.finditer(raw))
+    if not blocks:
+        return raw
+    head, tail = raw[:blocks[0].start()], raw[blocks[-1].end():]
+    entries = []
+    for rep in range(repeat):
+        for block in blocks:
+            index = len(entries)
+            entry = block.group(0)
+            marker = f"{copy}-{rep}"
+            if marker != "0-0":
+                entry = LINK_RE.sub(lambda m: (m.group(1) or m.group(3)) + (m.group(2) or m.group(4))
+                                    + (b"&" if b"?" in (m.group(2) or m.group(4)) else b"?") + f"replay={marker}".encode(), entry)
+                entry = TITLE_RE.sub(lambda m: m.group(1) + f"[{marker}] ".encode(), entry, count=1)
+
+            def rebase(m):
+                original = nt.parse_date_text(m.group(2).decode("utf-8", "replace"))
+                if original is None:
+                    return m.group(0)  # non-standard dates are replayed verbatim
+                when = format_date(m.group(1), original, anchor - index * ENTRY_SPACING)
+                return m.group(0).replace(m.group(2), when)
+            entries.append(nt.ENTRY_DATE_RE.sub(rebase, entry))
+    return head + b"\n".join(entries) + tail
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real sites
+
+    def do_GET(self):
+        replay = self.server.replay
+        parts = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parts.query)
+        name = parts.path.strip("/")
+        if name not in os.listdir(FIXTURE_DIR):
+            return self.reply(404, b"unknown fixture")
+        if replay.latency:
+            time.sleep(replay.latency + random.uniform(0, replay.jitter))
+        with replay.lock:
+            roll = replay.random.random()
+        if roll < replay.error_rate:
+            return self.reply(503, b"replayed error")
+        if roll < replay.error_rate + replay.not_modified_rate:
+            return self.reply(304)
+        body = replay.body(name, int(query.get("copy", ["0"])[0]), int(query.get("repeat", ["1"])[0]))
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            return self.reply(304, headers={"ETag": etag})
+        headers = {"ETag": etag, "Content-Type": "application/rss+xml; charset=utf-8"}
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        self.reply(200, body, headers)
+
+    def reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)) if status != 304 else "0")
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class ReplayServer:
+    """One local HTTP server per real feed host, so per-host connection limits behave as in production.
+    latency/jitter are in seconds; error_rate and not_modified_rate are fractions of requests."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, not_modified_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.not_modified_rate = not_modified_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.anchor = datetime.now(timezone.utc).replace(microsecond=0)
+        self.fixtures = {}
+        self.bodies = {}
+        self.servers = {}
+
+    def body(self, name, copy, repeat):
+        key = (name, copy, repeat)
+        with self.lock:
+            if key not in self.bodies:
+                if name not in self.fixtures:
+                    with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+                        self.fixtures[name] = f.read()
+                self.bodies[key] = render_fixture(self.fixtures[name], copy, repeat, self.anchor)
+            return self.bodies[key]
+
+    def start(self, feeds=None):
+        for url in (feeds or nt.RSS_FEEDS).values():
+            host = urllib.parse.urlsplit(url).netloc
+            if host not in self.servers:
+                server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+                server.daemon_threads = True
+                server.replay = self
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                self.servers[host] = server
+        return self
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+
+    def feeds(self, scale=1):
+        # RSS_FEEDS x scale, each pointing at its host's replay server and fixture shape
+        replayed = {}
+        for copy in range(scale):
+            for source, url in nt.RSS_FEEDS.items():
+                fixture, repeat = fixture_for(url)
+                port = self.servers[urllib.parse.urlsplit(url).netloc].server_address[1]
+                name = source if copy == 0 else f"{source} #{copy}"
+                replayed[name] = f"http://127.0.0.1:{port}/{fixture}?copy={copy}&repeat={repeat}"
+        return replayed
+
+# --- Benchmarks ---
+def fresh_store(workdir, name):
+    # Private database and archive; the legacy news_cache.csv is not imported into benchmark stores
+    nt.DB_PATH = os.path.join(workdir, f"{name}.db")
+    nt.CSV_PATH = ""
+    return nt.open_store()
+
+def bench_ingest(server, scale, workdir):
+    # Cold pass into an empty store, then a warm pass where validators and digests should short-circuit.
+    # The scan deadline grows with the feed count, so the bench measures throughput rather than the deadline.
+    feeds = server.feeds(scale)
+    deadline = nt.FETCH_DEADLINE * scale
+    store = fresh_store(workdir, f"ingest_{scale}x")
+    result = {"feeds": len(feeds), "deadline_s": deadline}
+    try:
+        for name in ("cold", "warm"):
+            started = time.perf_counter()
+            new_count, failed_feeds = nt.ingest_once(store, feeds=feeds, deadline=deadline)
+            elapsed = time.perf_counter() - started
+            result[name] = {
+                "seconds": round(elapsed, 3),
+                "feeds_per_s": round(len(feeds) / elapsed, 1),
+                "new_articles": new_count,
+                "failed": len(failed_feeds),
+                "timeouts": sum(isinstance(error, TimeoutError) for _, error in failed_feeds),
+            }
+    finally:
+        store.close()
+    # Peak Python allocations of a cold pass, measured separately because tracing slows everything down
+    store = fresh_store(workdir, f"memory_{scale}x")
+    try:
+        tracemalloc.start()
+        nt.ingest_once(store, feeds=feeds, deadline=deadline)
+        result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+    finally:
+        tracemalloc.stop()
+        store.close()
+    return result
+
+def bench_classify(server):
+    # Cost per entry of feedparser, date parsing and normalization + classification over the whole corpus
+    bodies = []
+    for url in nt.RSS_FEEDS.values():
+        fixture, repeat = fixture_for(url)
+        bodies.append(server.body(fixture, 0, repeat))
+    started = time.perf_counter()
+    feeds = [feedparser.parse(body) for body in bodies]
+    parse_s = time.perf_counter() - started
+    entries = [entry for feed in feeds for entry in feed.entries]
+    rounds, started = 0, time.perf_counter()
+    while time.perf_counter() - started < CLASSIFY_MIN_SECONDS:
+        for entry in entries:
+            nt.parse_datetime(entry)
+            nt.prepare_article({"title": entry.get("title", ""), "summary": entry.get("summary", "")})
+        rounds += 1
+    classify_s = (time.perf_counter() - started) / rounds
+    return {
+        "entries": len(entries),
+        "parse_us_per_entry": round(parse_s / len(entries) * 1e6, 1),
+        "classify_us_per_entry": round(classify_s / len(entries) * 1e6, 1),
+    }
+
+def bench_truncation():
+    # The early exit must never drop an entry inside the window: for every fixture, at a cutoff on each of
+    # its entry dates, the truncated body keeps every entry the full body has at or after the cutoff.
+    # Runs on the recorded dates, so oldest-first fixtures keep their order.
+    cases, lost = 0, []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+            raw = f.read()
+        dates = {nt.entry_date(match.group(0)) for match in nt.NEWEST_ENTRY_RE.finditer(raw)} - {None}
+        for cutoff in sorted(dates):
+            recent = [
+                {entry.get("link") for entry in feedparser.parse(body).entries if nt.parse_datetime(entry) >= cutoff}
+                for body in (raw, nt.truncate_old_entries(raw, cutoff))
+            ]
+            cases += 1
+            if recent[0] - recent[1]:
+                lost.append(f"{name} @ {cutoff.isoformat()}: {len(recent[0] - recent[1])} entries")
+    return {"cases": cases, "lost": lost}
+
+def timed_out(results):
+    # "<scale>x <pass>" for every ingest pass that hit the deadline; its timings measure the deadline, not ingest
+    return [
+        f"{scale}x {name}: {result[name]['timeouts']} of {result['feeds']} feeds"
+        for scale, result in results["ingest"].items() for name in ("cold", "warm") if result[name]["timeouts"]
+    ]
+
+def compare(results, baseline, tolerance):
+    # (metric, baseline, current) for every timing that got slower than baseline * (1 + tolerance)
+    regressions = []
+    checks = [("classify", "classify_us_per_entry"), ("classify", "parse_us_per_entry")]
+    for scale in results["ingest"]:
+        checks += [("ingest", scale, "cold", "seconds"), ("ingest", scale, "warm", "seconds"), ("ingest", scale, "peak_mb")]
+    for path in checks:
+        current, before = results, baseline
+        for key in path:
+            current = current.get(key) if isinstance(current, dict) else None
+            before = before.get(key) if isinstance(before, dict) else None
+        if current is not None and before and current > before * (1 + tolerance):
+            regressions.append((".".join(path), before, current))
+    return regressions
+
+def run(args):
+    server = ReplayServer(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.not_modified_rate).start()
+    workdir = tempfile.mkdtemp(prefix="news_bench_")
+    results = {"config": vars(args), "ingest": {}}
+    try:
+        results["classify"] = bench_classify(server)
+        print(f"classify: {results['classify']}")
+        results["truncation"] = bench_truncation()
+        print(f"truncation: {results['truncation']['cases']} cases, {len(results['truncation']['lost'])} lost entries")
+        for scale in args.scale:
+            results["ingest"][str(scale)] = bench_ingest(server, scale, workdir)
+            print(f"ingest {scale}x: {results['ingest'][str(scale)]}")
+    finally:
+        server.stop()
+        nt.HTTP_CLIENT.close()
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    for case in results["truncation"]["lost"]:
+        print(f"LOST ENTRIES {case}")
+    for case in timed_out(results):
+        print(f"TIMED OUT {case}")
+    failed = bool(results["truncation"]["lost"] or timed_out(results))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for metric, before, current in regressions:
+            print(f"REGRESSION {metric}: {before} -> {current}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+def serve(args):
+    server = ReplayServer(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.not_modified_rate).start()
+    for source, url in server.feeds(args.scale).items():
+        print(f"{source}\t{url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="news_tracker_bench", description="Offline feed replay and ingest benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in [("run", "Run the benchmark suite"), ("serve", "Serve the replayed feeds until Ctrl+C")]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--latency-ms", default=0.0, type=float, help="Added response latency (default: %(default)s)")
+        command.add_argument("--jitter-ms", default=0.0, type=float, help="Extra random latency, uniform 0..N ms")
+        command.add_argument("--error-rate", default=0.0, type=float, help="Fraction of requests answered 503")
+        command.add_argument("--not-modified-rate", default=0.0, type=float, help="Fraction of requests answered 304")
+    commands.choices["run"].add_argument("--scale", default=DEFAULT_SCALES, type=int, nargs="+",
+                                         help="Multiples of the current feed count to ingest (default: 1 10 100)")
+    commands.choices["run"].add_argument("--save", help="Write results to this JSON file")
+    commands.choices["run"].add_argument("--baseline", help="Compare with a saved JSON file; exit 1 on regressions")
+    commands.choices["run"].add_argument("--tolerance", default=DEFAULT_TOLERANCE, type=float,
+                                         help="Allowed slowdown against --baseline (default: %(default)s)")
+    commands.choices["serve"].add_argument("--scale", default=1, type=int, help="Multiple of the current feed count")
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else serve(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,16 @@
+# Needs Streamlit 1.52 or newer: the export button passes a callable as download data, and Clear uses st.rerun()
 import streamlit as st
 import pandas as pd
-import feedparser
+import tempfile
+import time
+
 from datetime import datetime, timedelta, timezone
-import os
+
+from news_tracker import (
+    RSS_FEEDS, CATEGORIES, PAGE_SIZE, INGEST_DAYS, ARCHIVE_RETENTION_MONTHS, open_store, load_articles,
+    count_articles, search_articles, count_search, load_archived, count_archived, days_back_since, clear_store, ingest_once,
+    last_ingest, feed_status, feed_history, keyword_trends, detect_spikes, EXPORT_FORMATS, export_articles
+)
 
 st.set_page_config(
     page_title="Paint Industry News Tracker",
@@ -10,123 +18,14 @@ st.set_page_config(
     layout="wide"
 )
 
-CSV_PATH = "news_cache.csv"
-
-RSS_FEEDS = {
-    # Business & Economy
-    "Enterprise Press": "https://enterprise.press/feed/",
-    "Al Mal News": "https://www.almalnews.com/feed/",
-    "Amwal Al Ghad": "https://amwalalghad.com/feed/",
-    "Mubasher Info (English)": "https://english.mubasher.info/rss/",
-    "Mubasher Info (Arabic)": "https://arabic.mubasher.info/rss/",
-    "Daily News Egypt": "https://www.dailynewsegypt.com/feed/",
-    "Egypt Independent": "https://www.egyptindependent.com/feed/",
-    "Business Today Egypt": "https://www.businesstodayegypt.com/rss/",
-    "Masrawy Economy": "https://www.masrawy.com/rss/SectionRSS?secId=100204",
-    "Al Borsa News": "https://alborsanews.com/feed",
-    "Al Dostor Economy": "https://www.dostor.org/rss.aspx?SecId=4",
-    "Akhbar El Yom Economy": "https://akhbarelyom.com/rss?sectionId=69",
-    "Al Watan Economy": "https://www.elwatannews.com/rss/section/77",
-    "Youm7 Economy": "https://www.youm7.com/rss/SectionRss?SectionID=297",
-    "Sada Elbalad Economy": "https://www.elbalad.news/rss.aspx?sectionid=22",
-    "Al Ahram Economy": "https://gate.ahram.org.eg/rss/96.aspx",
-    "El Fagr Economy": "https://www.elfagr.org/rss/sections/24",
-    "Veto Gate Economy": "https://www.vetogate.com/rss/Section/3",
-    "Cairo 24 Economy": "https://www.cairo24.com/rss/Section/5",
-    "Masrawy Real Estate": "https://www.masrawy.com/rss/SectionRSS?secId=100209",
-    # Construction & Real Estate
-    "Construction Week Online ME": "https://www.constructionweekonline.com/rss",
-    "Al Bawaba Real Estate": "https://www.albawabhnews.com/rss/section/18",
-    "Al Masdar Real Estate": "https://almasdar.com/rss/section/6",
-    # General News (for broader coverage)
-    "Al Ahram": "https://gate.ahram.org.eg/rss/",
-    "Al Masry Al Youm": "https://www.almasryalyoum.com/rss/rssfeeds",
-    "Youm7": "https://www.youm7.com/rss/SectionRss?SectionID=65",
-    "Sada Elbalad": "https://www.elbalad.news/rss.aspx",
-    "El Watan": "https://www.elwatannews.com/rss/",
-    "Masr Alarabia": "https://www.masralarabia.com/rss",
-    "Mada Masr": "https://www.madamasr.com/en/feed",
-    "Masress": "https://masress.com/en/rss"
-}
-
-# One-word, market-research-relevant keywords for the Egyptian paint market
-CATEGORIES = {
-    "Brands": [
-        "National", "ناشيونال", "GLC", "جى", "باكين", "Pachin", "سايبس", "Sipes", "سكيب", "Scib", "ميدو", "Mido"
-    ],
-    "Products": [
-        "دهان", "paint", "طلاء", "enamel", "epoxy", "إيبوكسي", "acrylic", "أكريليك", "ورنيش", "varnish"
-    ],
-    "Materials": [
-        "pigment", "صبغة", "راتنج", "resin", "solvent", "مذيب", "titanium", "تيتانيوم", "oxide", "أكسيد"
-    ],
-    "Construction": [
-        "بناء", "construction", "عقارات", "real", "estate", "إسكان", "infrastructure", "بنية", "مشروع", "project"
-    ],
-    "Automotive": [
-        "سيارة", "car", "automotive", "مركبة", "vehicle", "طلاء", "دهان"
-    ],
-    "Regulation": [
-        "قانون", "regulation", "معيار", "standard", "مواصفة", "specification", "VOC", "وزارة", "ministry"
-    ],
-    "Innovation": [
-        "ابتكار", "innovation", "تطوير", "development", "بحث", "research", "تقنية", "technology", "صديق", "eco"
-    ],
-    "Trends": [
-        "موضة", "trend", "ألوان", "color", "ديكور", "design", "سوق", "market", "طلب", "demand"
-    ]
-}
-
-def parse_datetime(entry):
-    # Always return timezone-aware UTC datetime
-    for key in ["published_parsed", "updated_parsed"]:
-        if key in entry and entry[key]:
-            try:
-                return datetime(*entry[key][:6], tzinfo=timezone.utc)
-            except Exception:
-                continue
-    for key in ["published", "updated"]:
-        if key in entry and entry[key]:
-            try:
-                dt = pd.to_datetime(entry[key], utc=True)
-                return dt.to_pydatetime()
-            except Exception:
-                continue
-    return datetime.now(timezone.utc)
-
-def fetch_rss_news(keywords, days_back=180):
-    results = []
-    time_limit = datetime.now(timezone.utc) - timedelta(days=days_back)
-    for source, url in RSS_FEEDS.items():
-        feed = feedparser.parse(url)
-        for entry in feed.entries:
-            published_dt = parse_datetime(entry)
-            if published_dt < time_limit:
-                continue
-            content = (entry.get("title", "") + " " + entry.get("summary", "")).lower()
-            if any(kw.lower() in content for kw in keywords):
-                results.append({
-                    "timestamp": published_dt,
-                    "keyword": "(rss)",
-                    "title": entry.get("title", ""),
-                    "summary": entry.get("summary", ""),
-                    "link": entry.get("link", ""),
-                    "source": source
-                })
-    return results
-
-def load_or_create_cache():
-    if os.path.exists(CSV_PATH):
-        return pd.read_csv(CSV_PATH)
-    else:
-        df = pd.DataFrame(columns=["timestamp", "keyword", "title", "summary", "link", "source"])
-        df.to_csv(CSV_PATH, index=False)
-        return df
+if tuple(int(part) for part in st.__version__.split(".")[:2]) < (1, 52):
+    st.error(f"This app needs Streamlit 1.52 or newer (installed: {st.__version__}). Run `pip install -U streamlit`.")
+    st.stop()
 
 st.title("📰 Paint Industry News Tracker")
 st.markdown("""
 Get the latest Egyptian paint market news using simple, powerful one-word keywords in English & Arabic.
-Select a category and click 'Fetch Latest News' to see real-time results.
+Click 'Fetch Latest News' to scan every feed once; switching categories only filters what is already stored.
 """)
 
 col1, col2 = st.columns([1, 2])
@@ -138,62 +37,170 @@ with col1:
     for keyword in CATEGORIES[category]:
         st.markdown(f"• {keyword}")
 
-    days_back = st.slider("Days to look back", min_value=7, max_value=180, value=180, step=7)
-
-    if st.button("🔍 Fetch Latest News", use_container_width=True):
-        news_cache = load_or_create_cache()
-        new_entries = []
+    days_back = st.slider("Days to look back", min_value=7, max_value=ARCHIVE_RETENTION_MONTHS * 30, value=180, step=7,
+                          help=f"Beyond {INGEST_DAYS} days, older articles are read from the monthly archive")
 
+    if st.button("🔍 Fetch Latest News", width="stretch",
+                 help="Run one scan now; `python -m news_tracker ingest` keeps the archive fresh in the background"):
         with st.spinner("Scanning Egyptian RSS feeds..."):
-            rss_items = fetch_rss_news(CATEGORIES[category], days_back)
-            for item in rss_items:
-                if news_cache.empty or not ((news_cache["title"] == item["title"]).any()):
-                    new_entries.append(item)
-
-            if new_entries:
-                new_df = pd.DataFrame(new_entries)
-                updated_cache = pd.concat([news_cache, new_df], ignore_index=True)
-                updated_cache.to_csv(CSV_PATH, index=False)
-                st.success(f"✅ Found {len(new_entries)} new articles")
-            else:
-                st.info("No new news found for these keywords")
+            progress = st.progress(0.0, text="Waiting for feeds...")
+            partial = st.empty()
+            started = time.monotonic()
+
+            def show_progress(done, source, new_count, error):
+                progress.progress(done / len(RSS_FEEDS), text=f"{done}/{len(RSS_FEEDS)} feeds · {source}")
+                partial.caption(f"{new_count} new articles so far ({time.monotonic() - started:.1f}s)")
+
+            new_count, failed_feeds = ingest_once(on_feed=show_progress)
 
-    if st.button("🗑️ Clear News", help="Delete all cached news and reset the display"):
-        if os.path.exists(CSV_PATH):
-            os.remove(CSV_PATH)
+            if new_count:
+                st.success(f"✅ Found {new_count} new articles")
+            else:
+                st.info("No new news found")
+            if failed_feeds:
+                st.warning("Skipped feeds: " + ", ".join(f"{source} ({error})" for source, error in failed_feeds))
+
+    if st.button("🗑️ Clear News", help="Delete all cached and archived news and reset the display"):
+        store = open_store()
+        clear_store(store)
+        store.close()
         st.success("All news has been cleared.")
-        st.experimental_rerun()
+        st.rerun()
 
 with col2:
     st.subheader("Latest Industry News")
-    news_cache = load_or_create_cache()
-    if not news_cache.empty:
+    store = open_store()
+    archive_size = count_articles(store)
+    if archive_size:
+        search_text = st.text_input("🔎 Search the archive", placeholder="Arabic or English; end a word with * for prefix")
         show_all = st.checkbox("Show all categories", value=False)
-        filtered_news = news_cache if show_all else news_cache[news_cache["keyword"] == "(rss)"]
-        if 'timestamp' in filtered_news.columns:
-            filtered_news['timestamp'] = pd.to_datetime(filtered_news['timestamp'], errors='coerce')
-            filtered_news = filtered_news.sort_values("timestamp", ascending=False)
+        list_category = None if show_all else category
+        if search_text.strip():
+            since = datetime.now(timezone.utc) - timedelta(days=days_back)
+            total = count_search(store, search_text, list_category, since=since)
+            st.caption(f"{total} matching articles, best first")
+        else:
+            collapse = st.checkbox("Group syndicated copies", value=True)
+            total = count_articles(store, list_category, days_back, collapse_duplicates=collapse)
+
+        # Only the current page is queried and rendered, whatever the archive size
+        pages = max(1, -(-total // PAGE_SIZE))
+        if st.session_state.get("page", 1) > pages:
+            st.session_state["page"] = pages
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key="page")
+        offset = (page - 1) * PAGE_SIZE
+        if search_text.strip():
+            filtered_news = search_articles(store, search_text, list_category, since=since, offset=offset)
+        else:
+            filtered_news = load_articles(
+                store, list_category, days_back, collapse_duplicates=collapse, limit=PAGE_SIZE, offset=offset
+            )
+        filtered_news['timestamp'] = pd.to_datetime(filtered_news['timestamp'], errors='coerce')
 
         with st.container():
             for _, item in filtered_news.iterrows():
                 with st.expander(f"📄 {item['title']}"):
                     st.markdown(f"**Source:** {item.get('source', 'Unknown')}")
+                    if item.get("copies", 1) > 1:
+                        st.markdown(f"**Also reported by:** {item['sources']} ({item['copies']} copies)")
                     st.markdown(f"**Published:** {item['timestamp']}")
+                    st.markdown(f"**Matched:** {item['keyword']}")
                     st.markdown(item['summary'] if pd.notnull(item['summary']) else "No summary available")
                     st.markdown(f"[Read full article]({item['link']})")
+        st.caption(f"Showing {offset + 1 if len(filtered_news) else 0}–{offset + len(filtered_news)} of {total}")
+
+        # Search results already include the archive; otherwise archived pages are read only when asked for
+        if days_back > INGEST_DAYS and not search_text.strip() and st.checkbox(
+                f"🗄️ Also list archived articles older than {INGEST_DAYS} days", value=False):
+            archive_range = dict(since=days_back_since(days_back), until=days_back_since(INGEST_DAYS))
+            archived_total = count_archived(store, list_category, **archive_range)
+            archive_pages = max(1, -(-archived_total // PAGE_SIZE))
+            if st.session_state.get("archive_page", 1) > archive_pages:
+                st.session_state["archive_page"] = archive_pages
+            archive_page = st.number_input(f"Archive page (of {archive_pages})", min_value=1, max_value=archive_pages,
+                                           step=1, key="archive_page")
+            archive_offset = (archive_page - 1) * PAGE_SIZE
+            archived = load_archived(store, list_category, **archive_range, offset=archive_offset)
+            st.dataframe(archived[["timestamp", "title", "source", "link"]], hide_index=True, width="stretch")
+            st.caption(f"Archived {archive_offset + 1 if len(archived) else 0}–{archive_offset + len(archived)} of {archived_total}")
+    else:
+        st.info("No news items yet. Click 'Fetch Latest News' or start `python -m news_tracker ingest` to get started.")
+    latest_run = last_ingest(store)
+    feeds_health = feed_status(store)
+    latency_history = feed_history(store)
+    store.close()
+
+# Charts read the daily (day, category, keyword, source) rollup, never the articles themselves
+st.divider()
+st.subheader("📈 Keyword Trends")
+col1, col2 = st.columns([1, 3])
+with col1:
+    trend_days = st.selectbox("Period", [30, 90, 180, 365], index=1, format_func=lambda d: f"Last {d} days")
+    by_keyword = st.checkbox(f"Keywords in {category}", value=True, help="Untick to compare categories instead")
+    store = open_store()
+    trends = keyword_trends(store, category if by_keyword else None, days=trend_days)
+    store.close()
+with col2:
+    if trends.empty or not trends.to_numpy().any():
+        st.info("No keyword mentions in this period yet.")
     else:
-        st.info("No news items yet. Click 'Fetch Latest News' to get started.")
+        top_series = trends.sum().sort_values(ascending=False).index.tolist()
+        picked = st.multiselect("Series", top_series, default=top_series[:5])
+        st.line_chart(trends[picked] if picked else trends)
+        spikes = detect_spikes(trends)
+        if spikes.empty:
+            st.caption("No spikes: every day is within its trailing two-week range")
+        else:
+            st.caption("🔺 Spikes (mentions far above the trailing two-week average)")
+            st.dataframe(spikes.head(20), hide_index=True, width="stretch",
+                         column_config={"z_score": st.column_config.NumberColumn("z-score", format="%.1f")})
 
 st.divider()
 col1, col2 = st.columns([3, 1])
 with col1:
     st.caption("© 2025 Paint Industry News Tracker – Bilingual MVP")
+
+def export_file(fmt, category, days_back, search_text):
+    # Runs only when the download is clicked; rows are streamed to a temp file chunk by chunk, but Streamlit then
+    # reads the whole file into memory to serve it. `python -m news_tracker export` stays flat-memory end to end.
+    out = tempfile.TemporaryFile()
+    store = open_store()
+    try:
+        export_articles(store, out, fmt, category, days_back, search_text)
+    finally:
+        store.close()
+    out.seek(0)
+    return out
+
 with col2:
-    if not news_cache.empty:
-        csv = news_cache.to_csv(index=False)
-        st.download_button("📥 Export Data", csv, "paint_news.csv", "text/csv")
+    if archive_size:
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS), label_visibility="collapsed")
+        st.download_button(
+            "📥 Export Data",
+            lambda: export_file(export_format, list_category, days_back, search_text),
+            f"paint_news.{export_format}", EXPORT_FORMATS[export_format],
+            help="Exports what the list shows: category, days back and search"
+        )
 
 st.sidebar.title("Feeds Status")
-st.sidebar.success("✅ Egyptian RSS feeds active")
+if latest_run is None:
+    st.sidebar.warning("No ingest has run yet")
+else:
+    finished_at, run_new, run_failed = latest_run
+    st.sidebar.success(f"✅ Last ingest {finished_at:%Y-%m-%d %H:%M} UTC · {run_new} new · {run_failed} feeds failed")
+if not feeds_health.empty:
+    healthy = (feeds_health["error"].isna()).sum()
+    st.sidebar.caption(f"{healthy}/{len(feeds_health)} feeds answered on their last run · last 7 days below")
+    st.sidebar.dataframe(
+        feeds_health[["source", "status", "error_rate", "avg_latency_ms", "entries", "new_articles", "newest_age_h"]]
+        .rename(columns={"avg_latency_ms": "avg ms", "newest_age_h": "newest (h)", "new_articles": "new"}),
+        hide_index=True, width="stretch",
+        column_config={"error_rate": st.column_config.ProgressColumn("errors", min_value=0.0, max_value=1.0, format="percent")}
+    )
+    with st.sidebar.expander("Latency history"):
+        history_source = st.selectbox("Feed", feeds_health["source"].tolist())
+        history = latency_history[latency_history["source"] == history_source]
+        st.line_chart(history.set_index(pd.to_datetime(history["run_at"]))["latency_ms"])
+        st.caption(f"{history['error'].notna().sum()} failed of {len(history)} runs")
 st.sidebar.markdown("*Powered by one-word market research keywords for Egypt*")
 st.sidebar.markdown("**Note:** This is a prototype. For full functionality, please contact us.")
\ No newline at end of file